@@ -2,6 +2,8 @@ import streamlit as st
 import numpy as np
 from src.CategorizeCreditRisk.components.prediction import CustomData
 from src.CategorizeCreditRisk.pipeline.predict import PredictionPipeline
+from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
+from src.CategorizeCreditRisk.utils.encoding import FeatureEncoder
 
 
 # Page layout
@@ -20,19 +22,11 @@ st.subheader('User Inputs:')
 maritalstatus = st.radio("maritalstatus:", ("Married", "Single"))
 gender = st.radio("gender:", ("M", "F"))
 
-education = st.radio(
-    "education:", ("SSC", "OTHERS", "12TH", "UNDER GRADUATE", "GRADUATE", "PROFESSIONAL", "POST-GRADUATE")
-)
-encode_education = {
-    "SSC": 1,
-    "OTHERS": 1,
-    "12TH": 2,
-    "UNDER GRADUATE": 3,
-    "GRADUATE": 3,
-    "PROFESSIONAL": 3,
-    "POST-GRADUATE": 4
-}
-education = encode_education[education]
+# Categories come from the shared encoding spec, the Predictor encodes them exactly as in training
+prediction_config = ConfigurationManager().get_prediction_config(log=False)
+encoder = FeatureEncoder(prediction_config.ordinal_encodings, prediction_config.target_classes)
+
+education = st.radio("education:", tuple(encoder.get_categories("education")))
 
 last_prod_enq2 = st.radio("last_prod_enq2:", ("PL", "ConsumerLoan", "AL", "CC", "others", "HL"))
 first_prod_enq2 = st.radio("first_prod_enq2:", ("PL", "ConsumerLoan", "AL", "CC", "others", "HL"))
@@ -127,10 +121,10 @@ if st.button('Predict'):
     risk_category = predict_pipeline.predict(custom_data=custom_data)
 
     get_risk_category = {
-        1: "P1 - Least Risk",
-        2: "P2 - Some Risk",
-        3: "P3 - More Risk",
-        4: "P4 - Highest Risk"
+        "P1": "P1 - Least Risk",
+        "P2": "P2 - Some Risk",
+        "P3": "P3 - More Risk",
+        "P4": "P4 - Highest Risk"
     }
     risk_category = get_risk_category[risk_category]
 
@@ -0,0 +1,107 @@
+"""
+Benchmark: one-hot encoded vs. native categorical features (category codes split on by XGBoost)
+
+Training time, model size and single-row prediction latency (transformer + model, as served by Predictor), for
+growing cardinality of the categorical features.
+
+Run from the project root:
+    python -m benchmarks.native_categorical
+"""
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from pathlib import Path
+from xgboost import XGBClassifier
+from src.CategorizeCreditRisk.entity.config_entity import DataTransformationConfig
+from src.CategorizeCreditRisk.components.data_transformation import DataTransformation
+
+
+TARGET_CLASSES = ["P1", "P2", "P3", "P4"]
+MODEL_PARAMS = {"objective": "multi:softmax", "num_class": 4, "max_depth": 6, "tree_method": "hist"}
+
+
+def make_data(n_rows: int, n_num: int, n_cat: int, n_levels: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {f"num_{i}": rng.normal(size=n_rows) for i in range(n_num)}
+    data.update({f"cat_{i}": rng.choice([f"L{j}" for j in range(n_levels)], n_rows) for i in range(n_cat)})
+    # Target depends on the categories, so the trees split on them
+    score = sum(pd.Series(data[f"cat_{i}"]).str[1:].astype(int) % 4 for i in range(n_cat)) + data["num_0"]
+    data["target"] = np.asarray(TARGET_CLASSES)[pd.qcut(score, 4, labels=False)]
+    return pd.DataFrame(data)
+
+
+def get_transformer(df: pd.DataFrame, root_dir: str, native_categorical: bool):
+    df.to_csv(Path(root_dir, "processed_data.csv"), index=False)
+    config = DataTransformationConfig(
+        root_dir=root_dir,
+        preprocessed_dataset=str(Path(root_dir, "processed_data.csv")),
+        cat_features={col: "object" for col in df.columns if col.startswith("cat_")},
+        num_features={col: "float64" for col in df.columns if col.startswith("num_")},
+        target_variable={"target": "object"},
+        target_classes=TARGET_CLASSES,
+        ordinal_encodings={},
+        data_transformer=str(Path(root_dir, "data_transformer.pkl")),
+        transformed_data=str(Path(root_dir, "transformed_data")),
+        compact_output=True,
+        sparse_threshold=0.3,
+        native_categorical=native_categorical,
+        category_mapping=str(Path(root_dir, "category_mapping.json")),
+        warm_start=False
+    )
+    return DataTransformation(config=config)
+
+
+def train(x_train, y_train, feature_types, repeat=3) -> tuple:
+    best, booster = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dtrain = xgb.DMatrix(
+            x_train, label=y_train, feature_types=feature_types, enable_categorical=feature_types is not None
+        )
+        booster = xgb.train(MODEL_PARAMS, dtrain, num_boost_round=100)
+        best = min(best, time.perf_counter() - start)
+    return best, booster
+
+
+def single_row_latency(data_transformer, model: XGBClassifier, rows: pd.DataFrame) -> float:
+    # Median milliseconds to transform and predict one raw row
+    latencies = []
+    for i in range(len(rows)):
+        start = time.perf_counter()
+        model.predict(data_transformer.transform(rows.iloc[[i]]))
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies)) * 1000
+
+
+if __name__ == '__main__':
+    print(
+        f"{'rows':>8} {'levels':>7} {'mode':>8} {'columns':>8} {'train (s)':>10} {'model (KB)':>11} "
+        f"{'1-row (ms)':>11} {'accuracy':>9}"
+    )
+
+    for n_rows in [50_000]:
+        for n_levels in [5, 20, 50]:
+            df = make_data(n_rows, n_num=40, n_cat=4, n_levels=n_levels)
+
+            for mode, native_categorical in [("one-hot", False), ("native", True)]:
+                with tempfile.TemporaryDirectory() as root_dir:
+                    transformer = get_transformer(df, root_dir, native_categorical)
+                    data_transformer, x_train, x_test, y_train, y_test = transformer.get_transformed_data(
+                        log=False, save_artifacts=False
+                    )
+                    feature_types = transformer.get_feature_types(data_transformer)
+
+                train_seconds, booster = train(x_train, y_train, feature_types)
+                model = XGBClassifier(enable_categorical=native_categorical)
+                model.load_model(bytearray(booster.save_raw()))
+
+                rows = df.drop(columns="target").iloc[:500]
+                accuracy = float((model.predict(x_test) == y_test.to_numpy()).mean())
+
+                print(
+                    f"{n_rows:>8} {n_levels:>7} {mode:>8} {x_train.shape[1]:>8} {train_seconds:>10.2f} "
+                    f"{len(booster.save_raw('ubj')) / 1024:>11.1f} "
+                    f"{single_row_latency(data_transformer, model, rows):>11.3f} {accuracy:>9.4f}"
+                )
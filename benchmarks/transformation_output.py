@@ -0,0 +1,78 @@
+"""
+Benchmark: dense float64 DataFrame vs. compact (sparse one-hot / float32) transformation output
+
+Memory of the transformed train matrix and XGBClassifier fit time, for growing one-hot cardinality.
+
+Run from the project root:
+    python -m benchmarks.transformation_output
+"""
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from xgboost import XGBClassifier
+from src.CategorizeCreditRisk.entity.config_entity import DataTransformationConfig
+from src.CategorizeCreditRisk.components.data_transformation import DataTransformation
+from src.CategorizeCreditRisk.utils.dtypes import get_matrix_memory_usage
+
+
+TARGET_CLASSES = ["P1", "P2", "P3", "P4"]
+
+
+def make_data(n_rows: int, n_num: int, n_cat: int, n_levels: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {f"num_{i}": rng.normal(size=n_rows) for i in range(n_num)}
+    data.update({f"cat_{i}": rng.choice([f"L{j}" for j in range(n_levels)], n_rows) for i in range(n_cat)})
+    data["target"] = rng.choice(TARGET_CLASSES, n_rows)
+    return pd.DataFrame(data)
+
+
+def get_transformer(df: pd.DataFrame, root_dir: str, compact_output: bool, sparse_threshold: float):
+    df.to_csv(Path(root_dir, "processed_data.csv"), index=False)
+    config = DataTransformationConfig(
+        root_dir=root_dir,
+        preprocessed_dataset=str(Path(root_dir, "processed_data.csv")),
+        cat_features={col: "object" for col in df.columns if col.startswith("cat_")},
+        num_features={col: "float64" for col in df.columns if col.startswith("num_")},
+        target_variable={"target": "object"},
+        target_classes=TARGET_CLASSES,
+        ordinal_encodings={},
+        data_transformer=str(Path(root_dir, "data_transformer.pkl")),
+        transformed_data=str(Path(root_dir, "transformed_data")),
+        compact_output=compact_output,
+        sparse_threshold=sparse_threshold,
+        native_categorical=False,
+        category_mapping=str(Path(root_dir, "category_mapping.json")),
+        warm_start=False
+    )
+    return DataTransformation(config=config)
+
+
+def fit_time(x_train, y_train, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        XGBClassifier(n_estimators=50, max_depth=6, tree_method="hist", n_jobs=-1).fit(x_train, y_train)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    modes = [("dense float64", False, 0.3), ("compact", True, 0.3), ("sparse float32", True, 1.0)]
+    print(f"{'rows':>8} {'levels':>7} {'mode':>15} {'output':>24} {'memory (MB)':>12} {'fit (s)':>9}")
+
+    for n_rows in [50_000, 100_000]:
+        for n_levels in [5, 50, 200]:
+            df = make_data(n_rows, n_num=40, n_cat=4, n_levels=n_levels)
+
+            for mode, compact_output, sparse_threshold in modes:
+                with tempfile.TemporaryDirectory() as root_dir:
+                    transformer = get_transformer(df, root_dir, compact_output, sparse_threshold)
+                    _, x_train, _, y_train, _ = transformer.get_transformed_data(log=False, save_artifacts=False)
+
+                output = f"{type(x_train).__name__} {getattr(x_train, 'dtype', 'float64')}"
+                print(
+                    f"{n_rows:>8} {n_levels:>7} {mode:>15} {output:>24} "
+                    f"{get_matrix_memory_usage(x_train):>12.2f} {fit_time(x_train, y_train):>9.2f}"
+                )
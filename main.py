@@ -1,102 +1,38 @@
 import sys
+import argparse
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
-from src.CategorizeCreditRisk.pipeline.data_ingestion import DataIngestionPipeline
-from src.CategorizeCreditRisk.pipeline.data_validation import DataValidationPipeline
-from src.CategorizeCreditRisk.pipeline.data_preprocessing import DataPreprocessingPipeline
-from src.CategorizeCreditRisk.pipeline.data_transformation import DataTransformationPipeline
-from src.CategorizeCreditRisk.pipeline.model_training import ModelTrainingPipeline
-from src.CategorizeCreditRisk.pipeline.model_evaluation import ModelEvaluationPipeline
-
-
-logging.info(">>>>>> CategorizeCreditRisk pipeline started <<<<<<\n")
-
-STAGE_NAME = "Data Ingestion"
-
-try:
-    logging.info(f">>>>>> stage '{STAGE_NAME}' started <<<<<<")
-
-    data_ingestor = DataIngestionPipeline()
-    data_ingestor.main()
-
-    logging.info(f">>>>>> stage '{STAGE_NAME}' completed <<<<<<\n")
-
-except Exception as e:
-    logging.error(f"Error occurred while running {STAGE_NAME}!")
-    raise CustomException(e, sys)
-
-
-STAGE_NAME = "Data Validation"
-
-try:
-    logging.info(f">>>>>> stage '{STAGE_NAME}' started <<<<<<")
-
-    data_validator = DataValidationPipeline()
-    data_validator.main()
-
-    logging.info(f">>>>>> stage '{STAGE_NAME}' completed <<<<<<\n")
-
-except Exception as e:
-    logging.error(f"Error occurred while running {STAGE_NAME}!")
-    raise CustomException(e, sys)
-
-
-STAGE_NAME = "Data Preprocessing"
-
-try:
-    logging.info(f">>>>>> stage '{STAGE_NAME}' started <<<<<<")
-
-    data_preprocessor = DataPreprocessingPipeline()
-    data_preprocessor.main()
-
-    logging.info(f">>>>>> stage '{STAGE_NAME}' completed <<<<<<\n")
-
-except Exception as e:
-    logging.error(f"Error occurred while running {STAGE_NAME}!")
-    raise CustomException(e, sys)
-
-
-STAGE_NAME = "Data Transformation"
-
-try:
-    logging.info(f">>>>>> stage '{STAGE_NAME}' started <<<<<<")
-
-    data_transformer = DataTransformationPipeline()
-    data_transformer.main()
-
-    logging.info(f">>>>>> stage '{STAGE_NAME}' completed <<<<<<\n")
-
-except Exception as e:
-    logging.error(f"Error occurred while running {STAGE_NAME}!")
-    raise CustomException(e, sys)
-
-
-STAGE_NAME = "Model Training"
-
-try:
-    logging.info(f">>>>>> stage '{STAGE_NAME}' started <<<<<<")
-
-    model_trainer = ModelTrainingPipeline()
-    model_trainer.main()
-
-    logging.info(f">>>>>> stage '{STAGE_NAME}' completed <<<<<<\n")
-
-except Exception as e:
-    logging.error(f"Error occurred while running {STAGE_NAME}!")
-    raise CustomException(e, sys)
-
-
-STAGE_NAME = "Model Evaluation"
-
-try:
-    logging.info(f">>>>>> stage '{STAGE_NAME}' started <<<<<<")
-
-    model_evaluator = ModelEvaluationPipeline()
-    model_evaluator.main()
-
-    logging.info(f">>>>>> stage '{STAGE_NAME}' completed <<<<<<\n")
-    logging.info(">>>>>> Rural Credit Predictor Pipeline completed <<<<<<")
-
-except Exception as e:
-    logging.error(f"Error occurred while running {STAGE_NAME}!")
-    raise CustomException(e, sys)
+from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
+from src.CategorizeCreditRisk.pipeline.runner import PipelineRunner
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Runs the CategorizeCreditRisk pipeline stages as a DAG (dvc.yaml)")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="maximum number of stages running at the same time (default: config.yaml)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="run stages on a thread pool (shared configuration) or a process pool")
+    parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                        help="rerun a stage even if it is up to date, repeatable ('all' reruns every stage)")
+    args = parser.parse_args()
+
+    logging.info(">>>>>> CategorizeCreditRisk pipeline started <<<<<<\n")
+
+    try:
+        config_manager = ConfigurationManager()
+        pipeline_runner_config = config_manager.get_pipeline_runner_config()
+
+        pipeline_runner = PipelineRunner(
+            config=pipeline_runner_config,
+            config_manager=config_manager,
+            max_workers=args.max_workers,
+            executor=args.executor,
+            force=args.force
+        )
+        pipeline_runner.run()
+
+        logging.info(">>>>>> CategorizeCreditRisk pipeline completed <<<<<<")
+
+    except Exception as e:
+        logging.error(f"Error occurred while running CategorizeCreditRisk pipeline!")
+        raise CustomException(e, sys)
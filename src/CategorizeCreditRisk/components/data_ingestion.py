@@ -1,58 +1,217 @@
 import os
 import sys
+import zlib
+import shutil
 import zipfile
 import requests
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
-from src.CategorizeCreditRisk.utils.common import get_size
+from src.CategorizeCreditRisk.utils.common import get_size, get_file_hash, cache_raw_data, save_json, load_json
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.entity.config_entity import DataIngestionConfig
 
 
 class DataIngestion:
+    CHUNK_SIZE = 1024 * 1024
+    MAX_RETRIES = 3
+    PARALLEL_EXTRACTION_MIN_SIZE = 8 * 1024 * 1024
+
     def __init__(self, config: DataIngestionConfig):
         self.config = config
 
+    def _resolve_local_source(self):
+        parsed_url = urlparse(self.config.source_URL)
+
+        if parsed_url.scheme in ("http", "https"):
+            return None
+
+        if parsed_url.scheme == "file":
+            source = Path(url2pathname(parsed_url.path))
+        else:
+            source = Path(self.config.source_URL)
+
+        # A local directory stands in for the remote host holding the data file
+        return source / Path(self.config.data_file).name if source.is_dir() else source
+
+    def _is_verified(self, path: Path) -> bool:
+        if not self.config.source_sha256:
+            return True
+
+        return get_file_hash(path) == self.config.source_sha256.lower()
+
+    def _copy_local_source(self, source: Path, part_file: Path):
+        offset = part_file.stat().st_size if part_file.exists() else 0
+
+        logging.info(f"Copying data file from local source: {source} (resuming at byte {offset})")
+
+        with open(source, 'rb') as src, open(part_file, 'ab' if offset else 'wb') as dst:
+            src.seek(offset)
+            shutil.copyfileobj(src, dst, length=self.CHUNK_SIZE)
+
+    def _download_remote_source(self, part_file: Path):
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            offset = part_file.stat().st_size if part_file.exists() else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+            logging.info(f"Downloading data file (attempt {attempt}, resuming at byte {offset})")
+
+            try:
+                with requests.get(self.config.source_URL, headers=headers, stream=True, timeout=60) as response:
+                    # Requested range starts at the end of the file - nothing left to download
+                    if offset and response.status_code == 416:
+                        return
+
+                    response.raise_for_status()
+
+                    if offset and response.status_code != 206:
+                        logging.info("Source does not support resuming, restarting download from byte 0")
+
+                    with open(part_file, 'ab' if response.status_code == 206 else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                            f.write(chunk)
+                return
+
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == self.MAX_RETRIES:
+                    raise e
+                logging.error(f"Download interrupted: {e}. Retrying....")
+
     def download_file(self):
         try:
-            if not os.path.exists(self.config.data_file):
-                logging.info("Downloading data file from source URL:")
+            data_file = Path(self.config.data_file)
+            part_file = data_file.with_name(data_file.name + ".part")
+
+            if data_file.exists():
+                if self._is_verified(data_file):
+                    logging.info(f"Data file already exists of size: {get_size(data_file)}")
+                    return
 
-                response = requests.get(self.config.source_URL)
-                if response.status_code == 200:
-                    with open(self.config.data_file, 'wb') as f:
-                        f.write(response.content)
-                    logging.info(f"Data file downloaded and saved as: {self.config.data_file}")
-                else:
-                    logging.error(f"Failed to download data file, status code: {response.status_code}")
+                logging.info("Existing data file does not match the configured checksum, downloading again")
+                os.remove(data_file)
 
+            logging.info("Downloading data file from source URL:")
+
+            local_source = self._resolve_local_source()
+            if local_source is not None:
+                self._copy_local_source(local_source, part_file)
             else:
-                logging.info(f"Data file already exists of size: {get_size(Path(self.config.data_file))}")
+                self._download_remote_source(part_file)
+
+            if not self._is_verified(part_file):
+                os.remove(part_file)
+                raise ValueError(f"Checksum of downloaded data file does not match: {self.config.source_sha256}")
+
+            # Only a complete and verified download is moved into place
+            os.replace(part_file, data_file)
+
+            logging.info(f"Data file downloaded and saved as: {data_file}")
 
         except Exception as e:
             logging.error(f"Error occurred while downloading data file!")
             raise CustomException(e, sys)
 
+    def _get_fresh_targets(self, archive_hash: str) -> set:
+        if not os.path.exists(self.config.extraction_manifest):
+            return set()
+
+        manifest = load_json(Path(self.config.extraction_manifest))
+        if manifest.archive_sha256 != archive_hash:
+            return set()
+
+        return {
+            target for target, member in manifest.members.items()
+            if os.path.exists(target) and os.path.getsize(target) == member.size
+        }
+
+    def _extract_member(self, member: zipfile.ZipInfo, target: str):
+        tmp_target = f"{target}.tmp"
+        crc = 0
+
+        # Each worker reads through its own handle, so members decompress independently
+        with zipfile.ZipFile(self.config.data_file, 'r') as zip_ref:
+            with zip_ref.open(member) as src, open(tmp_target, 'wb') as dst:
+                for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b""):
+                    crc = zlib.crc32(chunk, crc)
+                    dst.write(chunk)
+
+        if crc != member.CRC:
+            os.remove(tmp_target)
+            raise zipfile.BadZipFile(f"CRC check failed for member: {member.filename}")
+
+        os.replace(tmp_target, target)
+
+        logging.info(f"Extracted {member.filename} to: {target} (CRC verified)")
+
     def unzip_file(self):
         try:
             os.makedirs(self.config.unzip_dir, exist_ok=True)
 
-            if not os.path.exists(self.config.internal_raw_file) or not os.path.exists(self.config.external_raw_file):
-                logging.info("Unzipping data file:")
+            archive_hash = get_file_hash(Path(self.config.data_file))
+            targets = [self.config.internal_raw_file, self.config.external_raw_file]
+            fresh_targets = self._get_fresh_targets(archive_hash)
 
-                with zipfile.ZipFile(self.config.data_file, 'r') as zip_ref:
-                    zip_ref.extractall(self.config.unzip_dir)
+            if all(target in fresh_targets for target in targets):
+                logging.info(f"Raw (unzipped) files are up to date with the archive at: {self.config.unzip_dir}")
+                return
 
-                logging.info(f"Data file unzipped successfully at: {self.config.unzip_dir}")
+            logging.info("Unzipping data file:")
 
-            else:
-                logging.info(f"Raw (unzipped) file already present at: {self.config.unzip_dir}")
+            with zipfile.ZipFile(self.config.data_file, 'r') as zip_ref:
+                members_by_name = {Path(info.filename).name: info for info in zip_ref.infolist() if not info.is_dir()}
+
+            missing = [Path(target).name for target in targets if Path(target).name not in members_by_name]
+            if missing:
+                raise FileNotFoundError(f"Members - {missing} are missing from the archive!")
+
+            manifest = {target: members_by_name[Path(target).name] for target in targets}
+
+            stale = {target: member for target, member in manifest.items() if target not in fresh_targets}
+            large = {t: m for t, m in stale.items() if m.file_size >= self.PARALLEL_EXTRACTION_MIN_SIZE}
+            small = {t: m for t, m in stale.items() if t not in large}
+
+            for target, member in small.items():
+                self._extract_member(member, target)
+
+            if large:
+                with ThreadPoolExecutor(max_workers=min(len(large), os.cpu_count() or 1)) as executor:
+                    futures = [executor.submit(self._extract_member, member, target) for target, member in large.items()]
+                    for future in futures:
+                        future.result()
+
+            save_json(
+                Path(self.config.extraction_manifest),
+                {
+                    "archive_sha256": archive_hash,
+                    "members": {
+                        target: {"member": member.filename, "crc": member.CRC, "size": member.file_size}
+                        for target, member in manifest.items()
+                    }
+                }
+            )
+
+            logging.info(f"Data file unzipped successfully at: {self.config.unzip_dir}")
 
         except Exception as e:
             logging.error(f"Error occurred while unzipping data file!")
             raise CustomException(e, sys)
 
+    def cache_raw_files(self):
+        try:
+            logging.info("Caching raw (unzipped) files in columnar format:")
+
+            for raw_file in [self.config.internal_raw_file, self.config.external_raw_file]:
+                cache_raw_data(Path(raw_file), Path(self.config.raw_data_cache_dir))
+
+            logging.info(f"Raw files cached successfully at: {self.config.raw_data_cache_dir}")
+
+        except Exception as e:
+            logging.error(f"Error occurred while caching raw files!")
+            raise CustomException(e, sys)
+
 
 if __name__ == "__main__":
     config_manager = ConfigurationManager()
@@ -61,3 +220,4 @@ if __name__ == "__main__":
     data_ingestion = DataIngestion(config=data_ingestion_config)
     data_ingestion.download_file()
     data_ingestion.unzip_file()
+    data_ingestion.cache_raw_files()
@@ -1,27 +1,115 @@
+import os
 import sys
+import time
+import shutil
+import tracemalloc
+import numpy as np
 import pandas as pd
-from scipy.stats import f_oneway
-from scipy.stats import chi2_contingency
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.common import load_raw_data, iter_raw_data_chunks, save_json, load_json
+from src.CategorizeCreditRisk.utils.preprocessing import (get_sentinel_mask,
+                                                          drop_sentinel_values,
+                                                          merge_on_key,
+                                                          get_cross_product_matrix,
+                                                          sequential_vif_elimination,
+                                                          get_class_moments,
+                                                          anova_from_moments,
+                                                          get_contingency_counts,
+                                                          chi_square_tests,
+                                                          get_data_fingerprint,
+                                                          DataFingerprint,
+                                                          SelectionStatistics)
+from src.CategorizeCreditRisk.utils.encoding import FeatureEncoder
+from src.CategorizeCreditRisk.utils.dtypes import (get_sentinel_columns,
+                                                   get_dtype_plan,
+                                                   apply_dtype_plan,
+                                                   get_memory_usage,
+                                                   is_categorical_feature)
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.entity.config_entity import DataPreprocessingConfig
 
 
+# Chunked mode: raw position of the internal rows, carried through the join to restore their order
+ROW_POSITION = "__row_position__"
+
+
 class DataPreprocessing:
     def __init__(self, config: DataPreprocessingConfig):
         self.config = config
-
-        self.internal_data = pd.read_excel(self.config.internal_raw_file)
-        self.internal_data.columns = [col.lower() for col in self.internal_data.columns]
-
-        self.external_data = pd.read_excel(self.config.external_raw_file)
-        self.external_data.columns = [col.lower() for col in self.external_data.columns]
+        self.params = self.config.preprocessing_params
+
+        # Chunked mode streams the raw data instead of holding both tables in memory
+        self.internal_data, self.external_data = None, None
+        # Columns whose sentinel values are masked (NA) by the compact dtypes
+        self.internal_sentinel_columns, self.external_sentinel_columns = [], []
+        if not self.params.chunked:
+            # Both raw tables are read at the same time, the sentinel cleanup covers internal 'age_oldest_tl' and
+            # every external column
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                internal_future = executor.submit(
+                    self._load_raw_data, "Internal", self.config.internal_raw_file, self.config.internal_data_schema,
+                    ['age_oldest_tl']
+                )
+                external_future = executor.submit(
+                    self._load_raw_data, "External", self.config.external_raw_file, self.config.external_data_schema,
+                    None
+                )
+                self.internal_data, self.internal_sentinel_columns = internal_future.result()
+                self.external_data, self.external_sentinel_columns = external_future.result()
 
         self.cat_features = self.config.cat_features
         self.num_features = self.config.num_features
         self.target_variable = self.config.target_variable
+        self.encoder = FeatureEncoder(self.config.ordinal_encodings, self.config.target_classes)
+
+        # [CleanedRaw] data is handed over in memory, disk copies are written in the background
+        self.cleaned_raw_data = None
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._pending_writes = []
+
+        # Results of the chi-square, VIF and ANOVA checks, cached by fingerprint of the [CleanedRaw] data
+        self.feature_selection = {}
+
+        # Chunked mode: statistics and fingerprint accumulated while merging, in place of in-memory [CleanedRaw] data
+        self.selection_statistics = None
+        self.data_fingerprint = None
+
+    def _load_raw_data(self, name: str, raw_file: str, data_schema: dict, cleaned_columns: list = None) -> tuple:
+        try:
+            df = load_raw_data(Path(raw_file), Path(self.config.raw_data_cache_dir))
+            df.columns = [col.lower() for col in df.columns]
+
+            sentinel_columns = []
+            if self.params.compact_dtypes:
+                # Downcast integers, categoricals as pandas Categorical, sentinel values masked in the columns the
+                # sentinel cleanup handles (all if None)
+                sentinel_value = self.params.sentinel_value
+                sentinel_columns = get_sentinel_columns(
+                    df, list(df.columns) if cleaned_columns is None else cleaned_columns
+                )
+
+                memory_before = get_memory_usage(df)
+                df = apply_dtype_plan(
+                    df, get_dtype_plan(df, data_schema, sentinel_value, sentinel_columns), sentinel_value,
+                    sentinel_columns
+                )
+                memory_after = get_memory_usage(df)
+
+                logging.info(
+                    f"{name} Data - Memory: {memory_before:.2f} MB -> {memory_after:.2f} MB with compact dtypes "
+                    f"(saved {memory_before - memory_after:.2f} MB)"
+                )
+
+            return df, sentinel_columns
+
+        except Exception as e:
+            logging.error(f"Error occurred while loading {name.lower()} raw data!")
+            raise CustomException(e, sys)
 
     def _impute_missing_values(self) -> tuple[pd.DataFrame, pd.DataFrame, list]:
         try:
@@ -33,7 +121,11 @@ class DataPreprocessing:
             logging.info(
                 f"Internal Data (pre-cleanup) - Shape: {df1.shape}, | Rows: {df1.shape[0]}, Columns: {df1.shape[1]}"
             )
-            df1 = df1[df1['age_oldest_tl'] != -99999]
+            df1 = df1[
+                ~get_sentinel_mask(
+                    df1[['age_oldest_tl']], self.params.sentinel_value, self.internal_sentinel_columns
+                )[:, 0]
+            ]
             logging.info(
                 f"Internal Data (post-cleanup) - Shape: {df1.shape}, | Rows: {df1.shape[0]}, Columns: {df1.shape[1]}"
             )
@@ -47,16 +139,13 @@ class DataPreprocessing:
                 f"External Data (pre-cleanup) - Shape: {df2.shape}, | Rows: {df2.shape[0]}, Columns: {df2.shape[1]}"
             )
 
-            columns_to_be_removed = []
-            for col in df2.columns:
-                if df2.loc[df2[col] == -99999].shape[0] > 10000:
-                    columns_to_be_removed.append(col)
-            logging.info(f"All features to be removed ({len(columns_to_be_removed)}): {columns_to_be_removed}")
-
-            df2 = df2.drop(columns_to_be_removed, axis=1)
-
-            for col in df2.columns:
-                df2 = df2.loc[df2[col] != -99999]
+            df2, columns_to_be_removed, sentinel_counts = drop_sentinel_values(
+                df2, self.params.sentinel_value, self.params.max_sentinel_count, self.external_sentinel_columns
+            )
+            logging.info(
+                f"All features to be removed ({len(columns_to_be_removed)}) with more than "
+                f"{self.params.max_sentinel_count} missing values: {sentinel_counts[columns_to_be_removed].to_dict()}"
+            )
 
             logging.info(
                 f"External Data (post-cleanup) - Shape: {df2.shape}, | Rows: {df2.shape[0]}, Columns: {df2.shape[1]}"
@@ -78,10 +167,41 @@ class DataPreprocessing:
             if log:
                 logging.info("Merging external and internal datasets:")
 
-            df = pd.merge(df1, df2, how='inner', left_on=common_features, right_on=common_features)
+            join_key = self.params.join_key
+
+            tracemalloc.start()
+            start_time = time.perf_counter()
+
+            df, conflicts = merge_on_key(df1, df2, join_key)
+
+            join_seconds = time.perf_counter() - start_time
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
 
             logging.info("Merged external and internal datasets successfully!")
             logging.info(f"Merged Dataset - Shape: {df.shape}, | Rows: {df.shape[0]}, Columns: {df.shape[1]}")
+            logging.info(f"Merged Dataset - Memory: {get_memory_usage(df):.2f} MB")
+            logging.info(
+                f"Join on '{join_key}' took {join_seconds:.3f}s, peak memory: {peak_memory / 1024 ** 2:.1f} MB"
+            )
+
+            conflicting_columns = {col: count for col, count in conflicts.items() if count}
+            if conflicting_columns:
+                logging.error(f"Shared columns disagree between datasets (rows per column): {conflicting_columns}")
+
+            save_json(
+                Path(self.config.merge_report),
+                {
+                    "join_key": join_key,
+                    "internal_rows": df1.shape[0],
+                    "external_rows": df2.shape[0],
+                    "merged_rows": df.shape[0],
+                    "common_features": common_features,
+                    "conflicts": conflicts,
+                    "join_seconds": join_seconds,
+                    "peak_memory_mb": peak_memory / 1024 ** 2
+                }
+            )
 
             return df
 
@@ -90,36 +210,297 @@ class DataPreprocessing:
                 logging.error(f"Merging external and internal datasets failed!")
             raise CustomException(e, sys)
 
-    def save_merged_data(self) -> None:
+    def save_merged_data(self, export_csv=None) -> None:
+        if self.params.chunked:
+            return self._save_merged_data_chunked(export_csv)
+
         try:
             df = self._merge_dataframes(log=False)
+            self.cleaned_raw_data = df
 
             logging.info("Saving [CleanedRaw] merged data:")
 
-            df.to_csv(self.config.cleaned_raw_dataset, index=False)
+            self._pending_writes.append(
+                self._writer.submit(df.to_parquet, self.config.cleaned_raw_dataset, index=False)
+            )
 
-            logging.info("[CleanedRaw] Merged data saved successfully!")
+            export_csv = self.params.export_cleaned_raw_csv if export_csv is None else export_csv
+            if export_csv:
+                self._pending_writes.append(
+                    self._writer.submit(df.to_csv, self.config.cleaned_raw_csv, index=False)
+                )
+
+            logging.info("[CleanedRaw] Merged data handed over in memory, saving to disk in the background!")
 
         except Exception as e:
             logging.error(f"Error occurred while saving [CleanedRaw] merged data!")
             raise CustomException(e, sys)
 
-    def _preprocess_cat_features(self) -> pd.DataFrame:
+    def wait_for_pending_writes(self) -> None:
         try:
-            cr_df = pd.read_csv(self.config.cleaned_raw_dataset)
+            for pending_write in self._pending_writes:
+                pending_write.result()
 
-            logging.info("Preprocessing categorical features:")
+            if self._pending_writes:
+                logging.info("[CleanedRaw] Merged data saved successfully!")
 
-            assert cr_df.isnull().sum().sum() == 0, "Stopping execution as there are missing values in cleanedRaw data!"
-            assert cr_df.duplicated().sum() == 0, "Stopping execution as there are duplicate values in cleanedRaw data!"
+            self._pending_writes = []
 
-            all_raw_features = list(cr_df.columns)
-            dependent_feature = list(self.target_variable)
-            raw_independent_features = [feature for feature in all_raw_features if feature not in dependent_feature]
-            raw_cat_features = [feature for feature in raw_independent_features if cr_df[feature].dtype == 'O']
-            raw_num_features = [
-                feature for feature in raw_independent_features if feature not in raw_cat_features + ['prospectid']
+        except Exception as e:
+            logging.error(f"Error occurred while saving [CleanedRaw] merged data!")
+            raise CustomException(e, sys)
+
+    def _get_partition_file(self, name: str, partition: int) -> Path:
+        return Path(self.config.partition_dir) / f"{name}-{partition:04d}.parquet"
+
+    def _count_external_sentinel_values(self) -> tuple:
+        sentinel_counts, n_rows = None, 0
+
+        for chunk in iter_raw_data_chunks(
+            Path(self.config.external_raw_file), Path(self.config.raw_data_cache_dir), self.params.chunk_size
+        ):
+            chunk.columns = [col.lower() for col in chunk.columns]
+            counts = (chunk == self.params.sentinel_value).sum()
+            sentinel_counts = counts if sentinel_counts is None else sentinel_counts + counts
+            n_rows += len(chunk)
+
+        columns_to_drop = list(sentinel_counts[sentinel_counts > self.params.max_sentinel_count].index)
+
+        return columns_to_drop, sentinel_counts, n_rows
+
+    def _partition_raw_data(
+            self, name: str, raw_file: str, clean_chunk, num_partitions: int, keep_position=False
+    ) -> tuple:
+        # Rows are hash-partitioned on the join key, so matching rows of both tables land in the same partition
+        writers, schema, rows_in, rows_out = {}, None, 0, 0
+
+        try:
+            chunks = iter_raw_data_chunks(Path(raw_file), Path(self.config.raw_data_cache_dir), self.params.chunk_size)
+            for chunk in chunks:
+                chunk.columns = [col.lower() for col in chunk.columns]
+                if keep_position:
+                    chunk[ROW_POSITION] = np.arange(rows_in, rows_in + len(chunk))
+                rows_in += len(chunk)
+
+                chunk = clean_chunk(chunk)
+                rows_out += len(chunk)
+
+                schema = schema or pa.Schema.from_pandas(chunk, preserve_index=False)
+                partitions = pd.util.hash_pandas_object(chunk[self.params.join_key], index=False).to_numpy() \
+                    % num_partitions
+
+                for partition, part in chunk.groupby(partitions):
+                    if partition not in writers:
+                        writers[partition] = pq.ParquetWriter(self._get_partition_file(name, partition), schema)
+                    writers[partition].write_table(pa.Table.from_pandas(part, schema=schema, preserve_index=False))
+
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        return rows_in, rows_out, schema.names if schema else []
+
+    def _save_merged_data_chunked(self, export_csv=None) -> None:
+        try:
+            logging.info(f"Merging external and internal datasets in chunks of {self.params.chunk_size} rows:")
+
+            tracemalloc.start()
+            start_time = time.perf_counter()
+
+            shutil.rmtree(self.config.partition_dir, ignore_errors=True)
+            os.makedirs(self.config.partition_dir, exist_ok=True)
+
+            # Pass 1 - sentinel counts of the external data decide which of its columns are dropped
+            columns_to_be_removed, sentinel_counts, external_rows = self._count_external_sentinel_values()
+            logging.info(
+                f"All features to be removed ({len(columns_to_be_removed)}) with more than "
+                f"{self.params.max_sentinel_count} missing values: {sentinel_counts[columns_to_be_removed].to_dict()}"
+            )
+
+            # About chunk_size external rows (and as many matching internal rows) per partition
+            num_partitions = max(-(-external_rows // self.params.chunk_size), 1)
+            logging.info(f"Partitioning {external_rows} external rows over {num_partitions} partitions")
+
+            # Pass 2 - cleaned rows of both tables are partitioned on the join key
+            sentinel_value = self.params.sentinel_value
+            internal_rows, internal_kept, internal_columns = self._partition_raw_data(
+                "internal", self.config.internal_raw_file,
+                lambda chunk: chunk[~get_sentinel_mask(chunk[['age_oldest_tl']], sentinel_value)[:, 0]],
+                num_partitions, keep_position=True
+            )
+            external_rows, external_kept, external_columns = self._partition_raw_data(
+                "external", self.config.external_raw_file,
+                lambda chunk: drop_sentinel_values(
+                    chunk.drop(columns_to_be_removed, axis=1), sentinel_value, len(chunk)
+                )[0],
+                num_partitions
+            )
+            logging.info(f"Internal Data - Rows: {internal_rows} (pre-cleanup), {internal_kept} (post-cleanup)")
+            logging.info(f"External Data - Rows: {external_rows} (pre-cleanup), {external_kept} (post-cleanup)")
+
+            common_features = [
+                feature for feature in internal_columns if feature in external_columns and feature != ROW_POSITION
             ]
+            logging.info(f'All common features ({len(common_features)}): {common_features}')
+
+            # Pass 3 - partitions are joined one at a time, merged rows are bucketed by their internal row position
+            conflicts, duplicate_rows, buckets, bucket_schema = {}, 0, {}, None
+
+            try:
+                for partition in range(num_partitions):
+                    internal_file = self._get_partition_file("internal", partition)
+                    external_file = self._get_partition_file("external", partition)
+                    if not (internal_file.exists() and external_file.exists()):
+                        continue
+
+                    df, partition_conflicts = merge_on_key(
+                        pd.read_parquet(internal_file), pd.read_parquet(external_file), self.params.join_key
+                    )
+                    if df.empty:
+                        continue
+
+                    for col, count in partition_conflicts.items():
+                        conflicts[col] = conflicts.get(col, 0) + count
+
+                    # Duplicate rows share their join key, so they always meet in the same partition
+                    duplicate_rows += int(df.drop(columns=ROW_POSITION).duplicated().sum())
+
+                    for bucket, part in df.groupby(df[ROW_POSITION].to_numpy() // self.params.chunk_size):
+                        table = pa.Table.from_pandas(part, preserve_index=False)
+                        if bucket not in buckets:
+                            bucket_schema = bucket_schema or table.schema
+                            buckets[bucket] = pq.ParquetWriter(
+                                self._get_partition_file("merged", bucket), bucket_schema
+                            )
+                        buckets[bucket].write_table(table.cast(bucket_schema))
+
+            finally:
+                for bucket_writer in buckets.values():
+                    bucket_writer.close()
+
+            # Pass 4 - buckets are saved in internal row order, as the in-memory merge returns the rows, the
+            # statistics and the fingerprint are accumulated along the way
+            export_csv = self.params.export_cleaned_raw_csv if export_csv is None else export_csv
+            target_variable = list(self.target_variable)[0]
+            merged_rows, writer = 0, None
+            self.data_fingerprint = DataFingerprint()
+
+            try:
+                for bucket in sorted(buckets):
+                    df = pd.read_parquet(self._get_partition_file("merged", bucket)).sort_values(ROW_POSITION)
+                    df = df.drop(columns=ROW_POSITION).reset_index(drop=True)
+
+                    if self.selection_statistics is None:
+                        independent_features = [feature for feature in df.columns if feature != target_variable]
+                        cat_features = [
+                            feature for feature in independent_features if is_categorical_feature(df[feature])
+                        ]
+                        self.selection_statistics = SelectionStatistics(
+                            cat_features,
+                            [
+                                feature for feature in independent_features
+                                if feature not in cat_features + [self.params.join_key]
+                            ],
+                            target_variable, list(self.config.target_classes), self.params.vif_centered
+                        )
+                    self.selection_statistics.update(df)
+                    self.data_fingerprint.update(df)
+
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    writer = writer or pq.ParquetWriter(self.config.cleaned_raw_dataset, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+
+                    if export_csv:
+                        df.to_csv(self.config.cleaned_raw_csv, mode='w' if merged_rows == 0 else 'a',
+                                  header=merged_rows == 0, index=False)
+
+                    merged_rows += len(df)
+
+            finally:
+                if writer is not None:
+                    writer.close()
+
+            shutil.rmtree(self.config.partition_dir, ignore_errors=True)
+
+            assert merged_rows > 0, "Stopping execution as no rows matched between internal and external data!"
+            assert duplicate_rows == 0, "Stopping execution as there are duplicate values in cleanedRaw data!"
+
+            join_seconds = time.perf_counter() - start_time
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            logging.info(f"Merged Dataset - Rows: {merged_rows}, Columns: {len(writer.schema.names)}")
+            logging.info(f"Chunked merge took {join_seconds:.3f}s, peak memory: {peak_memory / 1024 ** 2:.1f} MB")
+
+            conflicting_columns = {col: count for col, count in conflicts.items() if count}
+            if conflicting_columns:
+                logging.error(f"Shared columns disagree between datasets (rows per column): {conflicting_columns}")
+
+            save_json(
+                Path(self.config.merge_report),
+                {
+                    "join_key": self.params.join_key,
+                    "internal_rows": internal_kept,
+                    "external_rows": external_kept,
+                    "merged_rows": merged_rows,
+                    "common_features": common_features,
+                    "conflicts": conflicts,
+                    "join_seconds": join_seconds,
+                    "peak_memory_mb": peak_memory / 1024 ** 2,
+                    "chunk_size": self.params.chunk_size,
+                    "num_partitions": num_partitions
+                }
+            )
+
+            logging.info("[CleanedRaw] Merged data saved successfully!")
+
+        except Exception as e:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            logging.error(f"Error occurred while saving [CleanedRaw] merged data in chunks!")
+            raise CustomException(e, sys)
+
+    def _load_cleaned_raw_data(self) -> pd.DataFrame:
+        if self.cleaned_raw_data is not None:
+            return self.cleaned_raw_data
+
+        return pd.read_parquet(self.config.cleaned_raw_dataset)
+
+    def _split_raw_features(self, cr_df: pd.DataFrame) -> tuple:
+        dependent_feature = list(self.target_variable)
+        raw_independent_features = [feature for feature in cr_df.columns if feature not in dependent_feature]
+        raw_cat_features = [feature for feature in raw_independent_features if is_categorical_feature(cr_df[feature])]
+        raw_num_features = [
+            feature for feature in raw_independent_features if feature not in raw_cat_features + ['prospectid']
+        ]
+
+        return raw_cat_features, raw_num_features
+
+    def _preprocess_cat_features(self, stats: SelectionStatistics = None) -> pd.DataFrame:
+        try:
+            dependent_feature = list(self.target_variable)
+
+            logging.info("Preprocessing categorical features:")
+
+            if stats is None:
+                cr_df = self._load_cleaned_raw_data()
+
+                assert cr_df.isnull().sum().sum() == 0, \
+                    "Stopping execution as there are missing values in cleanedRaw data!"
+                assert cr_df.duplicated().sum() == 0, \
+                    "Stopping execution as there are duplicate values in cleanedRaw data!"
+
+                all_raw_features = list(cr_df.columns)
+                raw_cat_features, raw_num_features = self._split_raw_features(cr_df)
+
+            else:
+                # Chunked mode - duplicates were already checked partition by partition
+                cr_df = None
+
+                assert stats.null_count == 0, "Stopping execution as there are missing values in cleanedRaw data!"
+
+                raw_cat_features, raw_num_features = list(stats.cat_features), list(stats.num_features)
+                all_raw_features = raw_cat_features + raw_num_features + [self.params.join_key] + dependent_feature
 
             logging.info(
                 f"CleanedRaw Data:\n"
@@ -130,20 +511,47 @@ class DataPreprocessing:
 
             logging.info("Performing ChiSq test on cat_features:")
 
+            counts, offsets, tables = get_contingency_counts(cr_df, raw_cat_features, dependent_feature[0]) \
+                if stats is None else stats.get_contingency_counts()
+            chi2_results = chi_square_tests(counts, offsets, raw_cat_features)
+
             keep_these, drop_these = [], []
-            for feature in raw_cat_features:
-                chi2, pval, _, _ = chi2_contingency(pd.crosstab(cr_df[feature], cr_df[dependent_feature[0]]))
-                if pval < 0.05:
+            for feature, result in chi2_results.items():
+                pval = result["p_value"]
+                result["retained"] = pval < self.params.chi2_pvalue_threshold
+                if result["retained"]:
                     keep_these.append(feature)
                     logging.info(f"[+] Feature: {feature}, pval: {round(pval, 4)}")
                 else:
                     drop_these.append(feature)
-                    logging.info("[-] Feature: {feature}, pval: {pval}")
+                    logging.info(f"[-] Feature: {feature}, pval: {round(pval, 4)}")
+
+            self.feature_selection["chi2"] = {
+                feature: {"p_value": result["p_value"], "retained": result["retained"]}
+                for feature, result in chi2_results.items()
+            }
+
+            # Kept with the cached selection as well, a cache hit writes the report again from there
+            self.feature_selection["chi2_report"] = {
+                "target_variable": dependent_feature[0],
+                "pvalue_threshold": self.params.chi2_pvalue_threshold,
+                "features": {
+                    feature: {
+                        **chi2_results[feature],
+                        "levels": [str(level) for level in table.index],
+                        "classes": [str(label) for label in table.columns],
+                        "table": table.to_numpy().tolist()
+                    }
+                    for feature, table in tables.items()
+                }
+            }
+            save_json(Path(self.config.chi2_report), self.feature_selection["chi2_report"])
 
             if drop_these:
                 logging.info(f"Features to be dropped ({len(drop_these)}): {drop_these}")
-                cr_df = cr_df.drop(drop_these, axis=1)
-                logging.info(f"Features dropped. Shape: {cr_df.shape}")
+                if cr_df is not None:
+                    cr_df = cr_df.drop(drop_these, axis=1)
+                    logging.info(f"Features dropped. Shape: {cr_df.shape}")
 
             else:
                 logging.info("We fail to reject the null hypothesis. No features to be dropped!")
@@ -156,57 +564,81 @@ class DataPreprocessing:
             logging.error("Preprocessing categorical features failed!")
             raise CustomException(e, sys)
 
-    def _preprocess_num_features(self) -> pd.DataFrame:
+    def _preprocess_num_features(self, stats: SelectionStatistics = None) -> pd.DataFrame:
         try:
-            cr_df, retained_cat_features, raw_num_features, dependent_feature = self._preprocess_cat_features()
+            if stats is None:
+                # VIF and ANOVA inputs only involve numerical features, they are prepared while ChiSq test runs
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    cat_future = executor.submit(self._preprocess_cat_features)
+
+                    num_data = self._load_cleaned_raw_data()
+                    _, num_features = self._split_raw_features(num_data)
+                    x = num_data[num_features].to_numpy(dtype=float)
+
+                    gram = get_cross_product_matrix(x, centered=self.params.vif_centered)
+                    class_codes = pd.Categorical(
+                        num_data[list(self.target_variable)[0]], categories=list(self.config.target_classes)
+                    ).codes.astype(np.int64)
+                    class_moments = get_class_moments(
+                        x, class_codes, len(self.config.target_classes), shift=x.mean(axis=0)
+                    )
+
+                    cr_df, retained_cat_features, raw_num_features, dependent_feature = cat_future.result()
+
+            else:
+                cr_df, retained_cat_features, raw_num_features, dependent_feature = self._preprocess_cat_features(stats)
+
+                gram = stats.get_cross_product_matrix()
 
             logging.info("Preprocessing numerical features:")
 
             # VIF check
             logging.info("Checking for multi-collinearity among numerical features:")
 
-            vif_data = cr_df[raw_num_features]
+            n_rows = len(cr_df) if stats is None else stats.n_rows
             logging.info(
-                f"VIF Data (pre-VIF) - Shape: {vif_data.shape} | Rows:{vif_data.shape[0]}, Columns:{vif_data.shape[1]}"
+                f"VIF Data (pre-VIF) - Shape: {(n_rows, len(raw_num_features))} | "
+                f"Rows:{n_rows}, Columns:{len(raw_num_features)}"
             )
 
-            columns_to_be_kept, columns_to_be_dropped, column_index = [], [], 0
-            for i in range(vif_data.shape[1]):
-                vif_value = variance_inflation_factor(vif_data, column_index)
-
-                if vif_value <= 6:
-                    logging.info(f"[+] {raw_num_features[i]}")
-                    columns_to_be_kept.append(raw_num_features[i])
-                    column_index += 1
-                else:
-                    logging.info(f"[-] {raw_num_features[i]}")
-                    columns_to_be_dropped.append(raw_num_features[i])
-                    vif_data = vif_data.drop(raw_num_features[i], axis=1)
+            columns_to_be_kept, columns_to_be_dropped, vif_values = sequential_vif_elimination(
+                gram, raw_num_features, self.params.vif_threshold
+            )
+            for feature in raw_num_features:
+                logging.info(
+                    f"[+] {feature}" if feature in columns_to_be_kept else f"[-] {feature}, VIF: {vif_values[feature]}"
+                )
 
             logging.info("Multi-collinearity checked successfully!")
             logging.info(f"All columns to be kept ({len(columns_to_be_kept)}): {columns_to_be_kept}")
             logging.info(f"All columns dropped ({len(columns_to_be_dropped)}): {columns_to_be_dropped}")
 
             logging.info(
-                f"VIF Data (post-VIF) - Shape: {vif_data.shape} | Rows:{vif_data.shape[0]}, Columns:{vif_data.shape[1]}"
+                f"VIF Data (post-VIF) - Shape: {(n_rows, len(columns_to_be_kept))} | "
+                f"Rows:{n_rows}, Columns:{len(columns_to_be_kept)}"
             )
 
             # ANOVA test
             logging.info("Performing ANOVA test on post VIF numerical features:")
 
-            retained_num_features, discarded_num_feature = [], []
-            for feature in columns_to_be_kept:
-                a = list(cr_df[feature])
-                b = list(cr_df[dependent_feature[0]])
-
-                group_p1 = [value for value, group in zip(a, b) if group == 'P1']
-                group_p2 = [value for value, group in zip(a, b) if group == 'P2']
-                group_p3 = [value for value, group in zip(a, b) if group == 'P3']
-                group_p4 = [value for value, group in zip(a, b) if group == 'P4']
+            if stats is None:
+                index = [raw_num_features.index(feature) for feature in columns_to_be_kept]
+                counts, sums, sums_of_squares = class_moments
+                f_statistics, p_values = anova_from_moments(counts, sums[:, index], sums_of_squares[:, index])
+            else:
+                f_statistics, p_values = anova_from_moments(*stats.get_class_moments(columns_to_be_kept))
 
-                f_statistic, p_value = f_oneway(group_p1, group_p2, group_p3, group_p4)
-                logging.info(f"[+] feature: {feature}" if p_value <= 0.05 else f"[-] feature: {feature}")
-                retained_num_features.append(feature) if p_value <= 0.05 else discarded_num_feature.append(feature)
+            retained_num_features, discarded_num_feature = [], []
+            for feature, p_value in zip(columns_to_be_kept, p_values):
+                is_retained = p_value <= self.params.anova_pvalue_threshold
+                logging.info(f"[+] feature: {feature}" if is_retained else f"[-] feature: {feature}")
+                retained_num_features.append(feature) if is_retained else discarded_num_feature.append(feature)
+
+            self.feature_selection["vif"] = vif_values
+            self.feature_selection["anova"] = {
+                feature: {"f_statistic": float(f_statistic), "p_value": float(p_value)}
+                for feature, f_statistic, p_value in zip(columns_to_be_kept, f_statistics, p_values)
+            }
 
             logging.info("ANOVA test performed successfully!")
             logging.info(f"Numerical features retained ({len(retained_num_features)}): {retained_num_features}")
@@ -220,53 +652,147 @@ class DataPreprocessing:
             logging.error("Preprocessing numerical features failed!")
             raise CustomException(e, sys)
 
-    def get_preprocessed_data(self, save_csv=True) -> None:
+    def _get_selection_params(self) -> dict:
+        return {
+            "target_variable": list(self.target_variable)[0],
+            "target_classes": list(self.config.target_classes),
+            "chi2_pvalue_threshold": self.params.chi2_pvalue_threshold,
+            "vif_threshold": self.params.vif_threshold,
+            "vif_centered": self.params.vif_centered,
+            "anova_pvalue_threshold": self.params.anova_pvalue_threshold
+        }
+
+    def _load_cached_selection(self, fingerprint: str):
+        if not self.params.reuse_feature_selection or not os.path.exists(self.config.feature_selection_cache):
+            return None
+
+        selection = load_json(Path(self.config.feature_selection_cache))
+
+        # Selections cached without their chi-square report cannot restore it, they are recomputed
+        return selection if selection.get("fingerprint") == fingerprint and "chi2_report" in selection else None
+
+    def _select_features(self) -> tuple:
         try:
-            cr_df, retained_cat_features, retained_num_features = self._preprocess_num_features()
+            selection_params = self._get_selection_params()
 
-            logging.info("Dropping unused columns and getting preprocessed data:")
+            if self.params.chunked:
+                # Statistics and fingerprint come from the merge pass (or one streaming pass over saved data)
+                cr_df, stats = None, self._get_selection_statistics()
+                fingerprint = self.data_fingerprint.hexdigest(selection_params)
+            else:
+                cr_df, stats = self._load_cleaned_raw_data(), None
+                fingerprint = get_data_fingerprint(cr_df, selection_params)
+
+            selection = self._load_cached_selection(fingerprint)
+            if selection is not None:
+                logging.info(f"[CleanedRaw] data and selection parameters unchanged ({fingerprint[:16]}), "
+                             f"reusing cached feature selection: {self.config.feature_selection_cache}")
+
+                # chi2_report is a stage output as well, it is written again from the cached selection
+                save_json(Path(self.config.chi2_report), selection.chi2_report.to_dict())
+
+                return cr_df, list(selection.retained_cat_features), list(selection.retained_num_features)
+
+            cr_df, retained_cat_features, retained_num_features = self._preprocess_num_features(stats)
+
+            save_json(
+                Path(self.config.feature_selection_cache),
+                {
+                    "fingerprint": fingerprint,
+                    "params": selection_params,
+                    "retained_cat_features": retained_cat_features,
+                    "retained_num_features": retained_num_features,
+                    **self.feature_selection
+                }
+            )
 
-            selected_features = retained_cat_features + retained_num_features
-            df_selected_features = cr_df[selected_features]
-
-            # Label Encode Education Variable
-            education_mapping = {
-                1: ['SSC', 'OTHERS'],
-                2: ['12TH'],
-                3: ['UNDER GRADUATE', 'GRADUATE', 'PROFESSIONAL'],
-                4: ['POST-GRADUATE']
-            }
+            return cr_df, retained_cat_features, retained_num_features
 
-            def __apply_education_map(education_level: str) -> int:
-                for tuned, to_be_tuned in education_mapping.items():
-                    education_level = tuned if education_level in to_be_tuned else education_level
+        except Exception as e:
+            logging.error("Selecting features failed!")
+            raise CustomException(e, sys)
 
-                return int(education_level)
+    def _get_selection_statistics(self) -> SelectionStatistics:
+        if self.selection_statistics is not None:
+            return self.selection_statistics
+
+        # [CleanedRaw] data saved by an earlier run - statistics and fingerprint are accumulated in one streaming pass
+        stats, self.data_fingerprint = None, DataFingerprint()
+        for batch in pq.ParquetFile(self.config.cleaned_raw_dataset).iter_batches(batch_size=self.params.chunk_size):
+            chunk = batch.to_pandas()
+            if stats is None:
+                target_variable = list(self.target_variable)[0]
+                independent_features = [feature for feature in chunk.columns if feature != target_variable]
+                cat_features = [feature for feature in independent_features if is_categorical_feature(chunk[feature])]
+                num_features = [
+                    feature for feature in independent_features if feature not in cat_features + [self.params.join_key]
+                ]
+                stats = SelectionStatistics(
+                    cat_features, num_features, target_variable,
+                    list(self.config.target_classes), self.params.vif_centered
+                )
+            stats.update(chunk)
+            self.data_fingerprint.update(chunk)
+
+        self.selection_statistics = stats
+
+        return stats
+
+    def _encode_selected_features(self, cr_df: pd.DataFrame, selected_features: list) -> pd.DataFrame:
+        # Label Encode ordinal features (education) with the encodings shared with training and serving
+        df_selected_features = self.encoder.encode(cr_df[selected_features])
+
+        # Add target variable to the end
+        target_variable = list(self.target_variable)[0]
+        df_selected_features.loc[:, target_variable] = cr_df[target_variable]
+
+        return df_selected_features
 
-            df_selected_features.loc[:, 'education'] = df_selected_features['education'].apply(__apply_education_map)
+    def get_preprocessed_data(self, save_csv=True) -> None:
+        try:
+            cr_df, retained_cat_features, retained_num_features = self._select_features()
 
-            retained_cat_features.remove('education') if 'education' in retained_cat_features else retained_cat_features
-            assert 'education' not in retained_cat_features, "Education feature not removed from cat_features!"
+            logging.info("Dropping unused columns and getting preprocessed data:")
+
+            selected_features = retained_cat_features + retained_num_features
 
-            retained_num_features = retained_num_features if 'education' in retained_num_features \
-                else retained_num_features + ['education']
-            assert 'education' in retained_num_features, "Education feature not added to num_features!"
+            # Ordinal features are numerical once encoded
+            for feature in self.encoder.ordinal_features:
+                if feature in retained_cat_features:
+                    retained_cat_features.remove(feature)
+                    retained_num_features = retained_num_features + [feature]
 
             assert sorted(list(self.cat_features)) == sorted(retained_cat_features), \
                 "Final cat_features does not match with its schema!"
             assert sorted(list(self.num_features)) == sorted(retained_num_features), \
                 "Final num_features does not match with its schema!"
 
-            # Add target variable to the end
-            target_variable = list(self.target_variable)[0]
-            df_selected_features.loc[:, target_variable] = cr_df[target_variable]
+            if self.params.chunked:
+                # Second streaming pass - selected columns are projected and exported chunk by chunk
+                if save_csv:
+                    logging.info("Exporting preprocessed data in chunks:")
+                    target_variable = list(self.target_variable)[0]
+                    batches = pq.ParquetFile(self.config.cleaned_raw_dataset).iter_batches(
+                        batch_size=self.params.chunk_size, columns=selected_features + [target_variable]
+                    )
+                    for i, batch in enumerate(batches):
+                        self._encode_selected_features(batch.to_pandas(), selected_features).to_csv(
+                            self.config.preprocessed_dataset, mode='w' if i == 0 else 'a', header=i == 0, index=False
+                        )
+                    logging.info("Preprocessed data exported successfully!")
+
+            else:
+                df_selected_features = self._encode_selected_features(cr_df, selected_features)
+                logging.info(f"Preprocessed Data - Memory: {get_memory_usage(df_selected_features):.2f} MB")
+
+                logging.info("Dropped unused columns. Preprocessed data ready to export!")
 
-            logging.info("Dropped unused columns. Preprocessed data ready to export!")
+                if save_csv:
+                    logging.info("Exporting preprocessed data:")
+                    df_selected_features.to_csv(self.config.preprocessed_dataset, index=False)
+                    logging.info("Preprocessed data exported successfully!")
 
-            if save_csv:
-                logging.info("Exporting preprocessed data:")
-                df_selected_features.to_csv(self.config.preprocessed_dataset, index=False)
-                logging.info("Preprocessed data exported successfully!")
+            self.wait_for_pending_writes()
 
         except Exception as e:
             logging.error(f"Error occurred while getting preprocessed data!")
@@ -1,22 +1,59 @@
+import os
 import sys
 import pickle
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from pathlib import Path
+from scipy import sparse
+from functools import partial
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler, FunctionTransformer
 from sklearn.compose import ColumnTransformer
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.context import PipelineContext, get_matrix_arrays
+from src.CategorizeCreditRisk.utils.common import save_json
+from src.CategorizeCreditRisk.utils.encoding import FeatureEncoder, CategoryCodeEncoder
+from src.CategorizeCreditRisk.utils.preprocessing import get_row_hashes
+from src.CategorizeCreditRisk.utils.dtypes import (
+    get_dtype_plan, apply_dtype_plan, get_memory_usage, get_matrix_memory_usage
+)
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.entity.config_entity import DataTransformationConfig
 
 
 class DataTransformation:
-    def __init__(self, config: DataTransformationConfig):
+    def __init__(self, config: DataTransformationConfig, context: PipelineContext = None):
         self.config = config
-        self.processed_data = pd.read_csv(self.config.preprocessed_dataset)
+        self.context = context or PipelineContext()
         self.cat_features = list(self.config.cat_features.keys())
         self.num_features = list(self.config.num_features.keys())
         self.target_variable = list(self.config.target_variable.keys())[0]
+        self.encoder = FeatureEncoder(self.config.ordinal_encodings, self.config.target_classes)
+        self.processed_data = self._load_processed_data()
+
+    def _load_processed_data(self) -> pd.DataFrame:
+        try:
+            df = pd.read_csv(self.config.preprocessed_dataset)
+
+            # Downcast integers and store categoricals as pandas Categorical, as planned from the schema
+            data_schema = {**self.config.cat_features, **self.config.num_features, **self.config.target_variable}
+
+            memory_before = get_memory_usage(df)
+            df = apply_dtype_plan(df, get_dtype_plan(df, data_schema))
+            memory_after = get_memory_usage(df)
+
+            logging.info(
+                f"Preprocessed Data - Memory: {memory_before:.2f} MB -> {memory_after:.2f} MB with compact dtypes "
+                f"(saved {memory_before - memory_after:.2f} MB)"
+            )
+
+            return df
+
+        except Exception as e:
+            logging.error(f"Error occurred while loading preprocessed data!")
+            raise CustomException(e, sys)
 
     def _split_data(self, log=True) -> tuple:
         try:
@@ -27,8 +64,8 @@ class DataTransformation:
 
             x, y = df.drop(self.target_variable, axis=1), df[self.target_variable]
 
-            mapping = {'P1': 0, 'P2': 1, 'P3': 2, 'P4': 3}
-            y = y.map(mapping)
+            x = self.encoder.encode(x)
+            y = self.encoder.encode_target(y)
 
             x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=0.33, random_state=42)
 
@@ -47,14 +84,35 @@ class DataTransformation:
             if log:
                 logging.info("> Getting data transformer:")
 
-            num_transformer = StandardScaler()
-            cat_transformer = OneHotEncoder(drop='first')
+            if self.config.native_categorical:
+                # Categoricals keep one column each, as category codes XGBoost splits on natively (see
+                # get_feature_types), numerics are scaled in float32; the output is a dense float32 array
+                to_float32 = FunctionTransformer(partial(np.asarray, dtype=np.float32), feature_names_out="one-to-one")
+                num_transformer = Pipeline([("Float32", to_float32), ("StandardScaler", StandardScaler())])
+                cat_transformer = CategoryCodeEncoder()
+                sparse_threshold = 0.0
+
+            elif self.config.compact_output:
+                # One-hot blocks stay sparse and every block is float32 (XGBoost works in float32 anyway); the
+                # output is CSR unless it is denser than sparse_threshold, then a dense float32 array
+                to_float32 = FunctionTransformer(partial(np.asarray, dtype=np.float32), feature_names_out="one-to-one")
+                num_transformer = Pipeline([("Float32", to_float32), ("StandardScaler", StandardScaler())])
+                cat_transformer = OneHotEncoder(drop='first', dtype=np.float32)
+                sparse_threshold = self.config.sparse_threshold
+
+            else:
+                num_transformer = StandardScaler()
+                cat_transformer = OneHotEncoder(drop='first')
+                # Output is always dense, it becomes a named DataFrame
+                sparse_threshold = 0.0
 
+            cat_name = "CategoryCodeEncoder" if self.config.native_categorical else "OneHotEncoder"
             data_transformer = ColumnTransformer(
                 [
-                    ("OneHotEncoder", cat_transformer, self.cat_features),
+                    (cat_name, cat_transformer, self.cat_features),
                     ("StandardScaler", num_transformer, self.num_features),
-                ]
+                ],
+                sparse_threshold=sparse_threshold
             )
 
             if log:
@@ -67,24 +125,118 @@ class DataTransformation:
                 logging.error(f"Error occurred while getting data transformer!")
             raise CustomException(e, sys)
 
-    def get_transformed_data(self, log=True, save_transformer=True) -> tuple:
+    def get_feature_types(self, data_transformer: ColumnTransformer) -> list:
+        """
+        XGBoost feature type per output column of the data transformer: "c" (categorical) for category codes, "q"
+        (quantitative) for every other column; None if the categoricals are one-hot encoded
+        """
+        if not self.config.native_categorical:
+            return None
+
+        return [
+            "c" if name.startswith("CategoryCodeEncoder__") else "q"
+            for name in data_transformer.get_feature_names_out()
+        ]
+
+    def get_category_mapping(self, data_transformer: ColumnTransformer) -> dict:
+        """
+        Categories per categorical feature of the fitted data transformer: the category code per category, or its
+        position among the one-hot categories (the first one is dropped)
+        """
+        if self.config.native_categorical:
+            return data_transformer.named_transformers_["CategoryCodeEncoder"].get_mapping()
+
+        one_hot_encoder = data_transformer.named_transformers_["OneHotEncoder"]
+        return {
+            feature: {str(category): position for position, category in enumerate(categories)}
+            for feature, categories in zip(self.cat_features, one_hot_encoder.categories_)
+        }
+
+    def _get_unseen_categories(self, data_transformer: ColumnTransformer, x: pd.DataFrame) -> dict:
+        # Categories of the data the fitted categorical encoder (one-hot or category codes) does not know
+        cat_name = "CategoryCodeEncoder" if self.config.native_categorical else "OneHotEncoder"
+        cat_columns = next(columns for name, _, columns in data_transformer.transformers_ if name == cat_name)
+        categories = data_transformer.named_transformers_[cat_name].categories_
+        if not isinstance(categories, dict):
+            categories = dict(zip(cat_columns, categories))
+
+        unseen = {}
+        for feature in cat_columns:
+            values = set(x[feature].dropna().astype(str).unique()) - {str(category) for category in categories[feature]}
+            if values:
+                unseen[feature] = sorted(values)
+
+        return unseen
+
+    def _get_frozen_transformer(self, x_train: pd.DataFrame, x_test: pd.DataFrame):
+        """
+        With warm start, the data transformer saved by the previous run, reused as it is instead of being refitted:
+        warm-started training continues boosting a model trained on its feature space (scaling, categories)
+
+        It is refitted if the features or the categorical mode changed, or if the data brings categories it has not
+        seen; training then retrains from scratch (the base model belongs to another data transformer).
+
+        Returns:
+            ColumnTransformer: fitted data transformer, None if it has to be fitted
+        """
+        if not self.config.warm_start or not os.path.exists(self.config.data_transformer):
+            return None
+
+        with open(self.config.data_transformer, 'rb') as file:
+            data_transformer = pickle.load(file)
+
+        cat_name = "CategoryCodeEncoder" if self.config.native_categorical else "OneHotEncoder"
+        if cat_name not in data_transformer.named_transformers_ or \
+                list(data_transformer.feature_names_in_) != list(x_train.columns):
+            logging.info("Warm start - Features changed since the data transformer was fitted, refitting it")
+            return None
+
+        unseen_categories = self._get_unseen_categories(data_transformer, pd.concat([x_train, x_test]))
+        if unseen_categories:
+            logging.info(
+                f"Warm start - Categories not seen by the data transformer: {unseen_categories}, refitting it "
+                f"(the model is retrained from scratch)"
+            )
+            return None
+
+        logging.info(f"Warm start - Reusing data transformer: {self.config.data_transformer}")
+
+        return data_transformer
+
+    def get_transformed_data(self, log=True, save_artifacts=True) -> tuple:
         try:
             if log:
                 logging.info("> Transforming data:")
 
             _x_train, _x_test, y_train, y_test = self._split_data()
-            data_transformer = self._get_data_transformer()
-
-            x_train = data_transformer.fit_transform(_x_train)
-            x_train = pd.DataFrame(x_train, columns=data_transformer.get_feature_names_out())
+            data_transformer = self._get_frozen_transformer(_x_train, _x_test)
+            is_refitted = data_transformer is None
 
+            if is_refitted:
+                data_transformer = self._get_data_transformer()
+                x_train = data_transformer.fit_transform(_x_train)
+            else:
+                x_train = data_transformer.transform(_x_train)
             x_test = data_transformer.transform(_x_test)
-            x_test = pd.DataFrame(x_test, columns=data_transformer.get_feature_names_out())
+
+            if self.config.compact_output or self.config.native_categorical:
+                # Matrices go to XGBoost as they are, feature names are kept apart
+                dense_memory = x_train.shape[0] * x_train.shape[1] * np.dtype(np.float64).itemsize / 1024 ** 2
+                logging.info(
+                    f"Transformed train data - Memory: {get_matrix_memory_usage(x_train):.2f} MB "
+                    f"({'sparse' if sparse.issparse(x_train) else 'dense'} {x_train.dtype}) vs "
+                    f"{dense_memory:.2f} MB as dense float64"
+                )
+
+            else:
+                x_train = pd.DataFrame(x_train, columns=data_transformer.get_feature_names_out())
+                x_test = pd.DataFrame(x_test, columns=data_transformer.get_feature_names_out())
 
             if log:
                 logging.info("Data transformed successfully!")
 
-            if save_transformer:
+            # A reused data transformer is left as it is on disk, training tells it apart by its file hash
+            if save_artifacts and is_refitted:
                 try:
                     logging.info("Saving data transformer:")
                     with open(self.config.data_transformer, 'wb') as file:
@@ -94,6 +246,34 @@ class DataTransformation:
                     logging.error("Error occurred while saving data transformer!")
                     raise CustomException(e, sys)
 
+            if save_artifacts:
+                # Categories the model is trained on (category codes, or one-hot column positions), for serving
+                # outside of the pickled transformer
+                save_json(Path(self.config.category_mapping), self.get_category_mapping(data_transformer))
+
+                # Downstream stages (training, evaluation) consume these instead of transforming the data again
+                self.context.put("data_transformer", data_transformer)
+                self.context.put_arrays(
+                    "transformed_data",
+                    {
+                        "feature_names": data_transformer.get_feature_names_out().astype(str),
+                        "train_index": _x_train.index.to_numpy(),
+                        "test_index": _x_test.index.to_numpy(),
+                        # Identify the rows, a warm start boosts (and is scored) on the rows its base model has not seen
+                        "train_row_hash": get_row_hashes(pd.concat([_x_train, y_train], axis=1)),
+                        "test_row_hash": get_row_hashes(pd.concat([_x_test, y_test], axis=1)),
+                        **(
+                            {"feature_types": np.asarray(self.get_feature_types(data_transformer))}
+                            if self.config.native_categorical else {}
+                        ),
+                        **get_matrix_arrays("x_train", x_train),
+                        **get_matrix_arrays("x_test", x_test),
+                        "y_train": y_train.to_numpy(),
+                        "y_test": y_test.to_numpy()
+                    },
+                    directory=self.config.transformed_data
+                )
+
             return data_transformer, x_train, x_test, y_train, y_test
 
         except Exception as e:
@@ -101,6 +281,49 @@ class DataTransformation:
                 logging.error(f"> Error occurred while transforming data!")
             raise CustomException(e, sys)
 
+    def get_cv_folds(self, n_splits: int, random_state: int, log=True) -> list:
+        """
+        Stratified k-fold split of the training set (the test set is left out), every fold is preprocessed by its
+        own data transformer fitted on the fold's training part only, so no statistics leak from its validation part
+
+        Args:
+            n_splits (int): number of folds
+            random_state (int): seed of the fold assignment
+
+        Returns:
+            list: per fold, its indices in the training set and transformed matrices
+        """
+        try:
+            if log:
+                logging.info(f"> Building {n_splits} stratified cross-validation folds:")
+
+            _x_train, _, y_train, _ = self._split_data(log=False)
+            y_train = y_train.to_numpy()
+
+            folds = []
+            splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+            for fit_index, valid_index in splitter.split(_x_train, y_train):
+                data_transformer = self._get_data_transformer(log=False)
+                folds.append({
+                    "fit_index": fit_index,
+                    "valid_index": valid_index,
+                    "x_fit": data_transformer.fit_transform(_x_train.iloc[fit_index]),
+                    "x_valid": data_transformer.transform(_x_train.iloc[valid_index]),
+                    "y_fit": y_train[fit_index],
+                    "y_valid": y_train[valid_index],
+                    "feature_types": self.get_feature_types(data_transformer)
+                })
+
+            if log:
+                logging.info("Cross-validation folds are ready!")
+
+            return folds
+
+        except Exception as e:
+            if log:
+                logging.error(f"Error occurred while building cross-validation folds!")
+            raise CustomException(e, sys)
+
 
 if __name__ == '__main__':
     config_manager = ConfigurationManager()
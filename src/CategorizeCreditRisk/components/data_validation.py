@@ -1,7 +1,10 @@
 import sys
-import pandas as pd
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.common import read_raw_data_header, iter_raw_data_chunks, save_json
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.entity.config_entity import DataValidationConfig
 
@@ -10,45 +13,125 @@ class DataValidation:
     def __init__(self, config: DataValidationConfig):
         self.config = config
 
+    @staticmethod
+    def _is_dtype_compatible(expected_dtype: str, series) -> bool:
+        if is_bool_dtype(series):
+            return False
+        if expected_dtype.startswith("int"):
+            return is_integer_dtype(series)
+        if expected_dtype.startswith("float"):
+            return is_numeric_dtype(series)
+
+        return not is_numeric_dtype(series)
+
+    def _validate_file(self, name: str, raw_file: str, data_schema: dict, allowed_values: dict) -> dict:
+        logging.info(f"> Validating {name} raw data file: {raw_file}")
+
+        raw_file, cache_dir = Path(raw_file), Path(self.config.raw_data_cache_dir)
+
+        # Column names - only the header row is read
+        columns = [str(col).lower() for col in read_raw_data_header(raw_file, cache_dir)]
+        extra = sorted(set(columns) - set(data_schema.keys()))
+        missing = sorted(set(data_schema.keys()) - set(columns))
+
+        report = {
+            "file": str(raw_file),
+            "status": not (extra or missing),
+            "extra_columns": extra,
+            "missing_columns": missing,
+            "rows_checked": 0,
+            "chunks_checked": 0,
+            "stopped_early": False,
+            "columns": {
+                col: {
+                    "expected_dtype": str(dtype),
+                    "observed_dtype": None,
+                    "status": True,
+                    "null_count": 0,
+                    "unexpected_values": {},
+                    "errors": []
+                }
+                for col, dtype in data_schema.items() if col in columns
+            }
+        }
+
+        if extra or missing:
+            logging.error(f"Columns - {extra} are extra!" if extra else f"Columns - {missing} are missing!")
+            report["stopped_early"] = True
+            return report
+
+        # Dtypes and allowed values - checked chunk by chunk, stopping at the first hard failure
+        for chunk in iter_raw_data_chunks(raw_file, cache_dir, self.config.chunk_size):
+            chunk.columns = [str(col).lower() for col in chunk.columns]
+            hard_failure = False
+
+            for col, col_report in report["columns"].items():
+                series = chunk[col]
+                col_report["observed_dtype"] = str(series.dtype)
+                col_report["null_count"] += int(series.isna().sum())
+
+                if not self._is_dtype_compatible(col_report["expected_dtype"], series):
+                    col_report["status"] = False
+                    col_report["errors"].append(
+                        f"dtype {series.dtype} is not compatible with {col_report['expected_dtype']} "
+                        f"(rows {report['rows_checked']} - {report['rows_checked'] + len(chunk) - 1})"
+                    )
+                    logging.error(f"Column - {col} has dtype {series.dtype}, expected {col_report['expected_dtype']}!")
+                    hard_failure = True
+
+                elif col in allowed_values:
+                    unexpected = series[~series.isin(allowed_values[col]) & series.notna()].value_counts()
+                    for value, count in unexpected.items():
+                        col_report["unexpected_values"][str(value)] = \
+                            col_report["unexpected_values"].get(str(value), 0) + int(count)
+                    if not unexpected.empty:
+                        col_report["status"] = False
+
+            report["rows_checked"] += len(chunk)
+            report["chunks_checked"] += 1
+
+            if hard_failure:
+                report["stopped_early"] = True
+                break
+
+        for col, col_report in report["columns"].items():
+            if col_report["unexpected_values"]:
+                logging.error(f"Column - {col} has unexpected values: {col_report['unexpected_values']}")
+
+        report["status"] = all(col_report["status"] for col_report in report["columns"].values())
+
+        logging.info(f"Checked {report['rows_checked']} rows in {report['chunks_checked']} chunks of {name} data")
+
+        return report
+
     def validate_schema(self):
         try:
             logging.info("Validating schema of internal/external raw data files:")
 
-            internal_data_validation_status = True
-            external_data_validation_status = True
-
-            internal_data = pd.read_excel(self.config.internal_raw_file)
-            internal_data.columns = [col.lower() for col in internal_data.columns]
-            internal_data_columns = sorted(internal_data.columns)
-            internal_data_schema = sorted(self.config.internal_data_schema.keys())
-
-            external_data = pd.read_excel(self.config.external_raw_file)
-            external_data.columns = [col.lower() for col in external_data.columns]
-            external_data_columns = sorted(external_data.columns)
-            external_data_schema = sorted(self.config.external_data_schema.keys())
-
-            if internal_data_columns != internal_data_schema:
-                extra = set(internal_data_columns) - set(internal_data_schema)
-                missing = set(internal_data_schema) - set(internal_data_columns)
-
-                logging.error(f"Columns - {extra} are extra!" if extra else f"Columns - {missing} are missing!")
-
-                internal_data_validation_status = False
-
+            # Internal and external files are independent, both are validated at the same time
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                internal_future = executor.submit(
+                    self._validate_file, "internal", self.config.internal_raw_file,
+                    self.config.internal_data_schema, self.config.internal_allowed_values
+                )
+                external_future = executor.submit(
+                    self._validate_file, "external", self.config.external_raw_file,
+                    self.config.external_data_schema, self.config.external_allowed_values
+                )
+                internal_report, external_report = internal_future.result(), external_future.result()
+
+            internal_data_validation_status = internal_report["status"]
+
+            save_json(Path(self.config.internal_file_val_report), internal_report)
             with open(self.config.internal_file_val_status, 'w') as f:
                 f.write(f"Validation status: {internal_data_validation_status}")
 
             logging.info(f"Internal Data - Final validation status: {internal_data_validation_status}")
 
 
-            if external_data_columns != external_data_schema:
-                extra = set(external_data_columns) - set(external_data_schema)
-                missing = set(external_data_schema) - set(external_data_columns)
-
-                logging.error(f"Columns - {extra} are extra!" if extra else f"Columns - {missing} are missing!")
-
-                external_data_validation_status = False
+            external_data_validation_status = external_report["status"]
 
+            save_json(Path(self.config.external_file_val_report), external_report)
             with open(self.config.external_file_val_status, 'w') as f:
                 f.write(f"Validation status: {external_data_validation_status}")
 
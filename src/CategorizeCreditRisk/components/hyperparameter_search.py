@@ -0,0 +1,177 @@
+import os
+import sys
+import math
+import numpy as np
+import xgboost as xgb
+from xgboost import XGBClassifier
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.model_selection import train_test_split
+from src.CategorizeCreditRisk.logger import logging
+from src.CategorizeCreditRisk.exception import CustomException
+
+
+# Metrics where higher is better, every other XGBoost metric (mlogloss, merror, ...) is minimized
+MAXIMIZED_METRICS = {"auc", "aucpr", "map", "ndcg"}
+
+# Fit/validation slices of the training DMatrix, loaded once per worker process
+_worker_data = {}
+
+
+def _init_worker(dmatrix_file: str, fit_index: np.ndarray, valid_index: np.ndarray):
+    dtrain = xgb.DMatrix(dmatrix_file)
+    _worker_data["fit"] = dtrain.slice(fit_index)
+    _worker_data["valid"] = dtrain.slice(valid_index)
+
+
+def _run_trial(params: dict, num_rounds: int, booster: bytes = None) -> tuple:
+    """
+    Boosts a trial for num_rounds more rounds, continuing from its booster of the previous rung
+
+    Returns:
+        tuple: validation score of the last round and the booster (raw bytes)
+    """
+    if booster is not None:
+        model = xgb.Booster()
+        model.load_model(bytearray(booster))
+        booster = model
+
+    evals_result = {}
+    booster = xgb.train(
+        params, _worker_data["fit"], num_boost_round=num_rounds, xgb_model=booster,
+        evals=[(_worker_data["valid"], "valid")], evals_result=evals_result, verbose_eval=False
+    )
+
+    return evals_result["valid"][params["eval_metric"]][-1], bytes(booster.save_raw())
+
+
+def sample_params(search_space: dict, rng: np.random.Generator) -> dict:
+    """
+    Samples one configuration from the search space declared in params.yaml
+
+    A parameter is either a list of values to choose from, or a range {type: int|float, low, high, log}.
+
+    Args:
+        search_space (dict): search space per parameter
+        rng (np.random.Generator): random generator
+
+    Returns:
+        dict: value per parameter
+    """
+    params = {}
+
+    for name, space in search_space.items():
+        if isinstance(space, (list, tuple)):
+            params[name] = space[rng.integers(len(space))]
+        elif space["type"] == "int":
+            params[name] = int(rng.integers(space["low"], space["high"] + 1))
+        elif space.get("log", False):
+            params[name] = float(math.exp(rng.uniform(math.log(space["low"]), math.log(space["high"]))))
+        else:
+            params[name] = float(rng.uniform(space["low"], space["high"]))
+
+    return params
+
+
+class HyperparameterSearch:
+    """
+    Random search over the declared search spaces, pruned with successive halving
+
+    Every rung boosts the surviving trials up to the rung's budget of rounds (continuing their boosters) and keeps
+    the best 1/reduction_factor of them for the next rung, the last rung's budget is n_estimators. Trials run on a
+    process pool, the machine's cores are split among the workers.
+
+    Args:
+        search_params (dict): HyperparameterSearch section of params.yaml
+        model_params (dict): XGBClassifier section of params.yaml, the fixed part of every trial
+    """
+    def __init__(self, search_params: dict, model_params: dict):
+        self.search_params = search_params
+        self.model_params = dict(model_params)
+        self.metric = search_params["metric"]
+        self.max_workers = search_params["max_workers"]
+        self.nthread = max(1, (os.cpu_count() or 1) // self.max_workers)
+
+    def _get_budgets(self) -> list:
+        budgets, budget = [], self.search_params["min_rounds"]
+        while budget < self.model_params["n_estimators"]:
+            budgets.append(int(budget))
+            budget *= self.search_params["reduction_factor"]
+
+        return budgets + [int(self.model_params["n_estimators"])]
+
+    def _get_booster_params(self, trial_params: dict) -> dict:
+        params = XGBClassifier(**{**self.model_params, **trial_params}, n_jobs=self.nthread).get_xgb_params()
+        return {**{key: value for key, value in params.items() if value is not None}, "eval_metric": self.metric}
+
+    def search(self, dmatrix_file: str, labels: np.ndarray) -> tuple:
+        """
+        Runs the search on the training DMatrix, trials are scored on a stratified validation slice of it
+
+        Args:
+            dmatrix_file (str): training DMatrix in XGBoost's binary format
+            labels (np.ndarray): training labels, to stratify the validation slice
+
+        Returns:
+            tuple: best configuration, its score and every trial (params, score per rung)
+        """
+        try:
+            rng = np.random.default_rng(self.search_params["random_state"])
+            trials = [
+                {"params": sample_params(self.search_params["search_space"], rng), "scores": {}}
+                for _ in range(self.search_params["n_trials"])
+            ]
+
+            fit_index, valid_index = train_test_split(
+                np.arange(len(labels)), test_size=self.search_params["validation_size"],
+                random_state=self.search_params["random_state"], stratify=labels
+            )
+
+            budgets = self._get_budgets()
+            maximize = self.metric in MAXIMIZED_METRICS
+
+            logging.info(
+                f"Searching {len(trials)} configurations on {self.max_workers} workers x {self.nthread} threads, "
+                f"successive halving rungs (rounds): {budgets}, metric: {self.metric}"
+            )
+
+            survivors, boosters, rounds_done = list(range(len(trials))), {}, 0
+
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker,
+                initargs=(dmatrix_file, fit_index, valid_index)
+            ) as executor:
+                for rung, budget in enumerate(budgets):
+                    results = executor.map(
+                        _run_trial,
+                        [self._get_booster_params(trials[trial]["params"]) for trial in survivors],
+                        [budget - rounds_done] * len(survivors),
+                        [boosters.get(trial) for trial in survivors]
+                    )
+
+                    for trial, (score, booster) in zip(survivors, results):
+                        trials[trial]["scores"][budget] = score
+                        boosters[trial] = booster
+
+                    survivors.sort(key=lambda trial: trials[trial]["scores"][budget], reverse=maximize)
+
+                    logging.info(
+                        f"Rung {rung} ({budget} rounds): {len(survivors)} trials, best {self.metric}: "
+                        f"{trials[survivors[0]]['scores'][budget]:.5f}"
+                    )
+
+                    if rung < len(budgets) - 1:
+                        keep = max(1, len(survivors) // self.search_params["reduction_factor"])
+                        for trial in survivors[keep:]:
+                            boosters.pop(trial)
+                        survivors = survivors[:keep]
+
+                    rounds_done = budget
+
+            best = trials[survivors[0]]
+            logging.info(f"Best configuration: {best['params']} ({self.metric}: {best['scores'][budgets[-1]]:.5f})")
+
+            return best["params"], best["scores"][budgets[-1]], trials
+
+        except Exception as e:
+            logging.error("Error occurred while searching hyperparameters!")
+            raise CustomException(e, sys)
@@ -1,5 +1,7 @@
 import sys
 import json
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 import mlflow
 from urllib.parse import urlparse
@@ -8,13 +10,16 @@ from sklearn.metrics import accuracy_score
 
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.common import save_json
+from src.CategorizeCreditRisk.utils.context import PipelineContext
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.components.model_trainer import ModelTrainer
 
 
 class ModelEvaluator:
-    def __init__(self, config):
+    def __init__(self, config, context: PipelineContext = None):
         self.config = config
+        self.context = context or PipelineContext()
 
     @staticmethod
     def _evaluate_model(true, predicted, log=True):
@@ -34,6 +39,12 @@ class ModelEvaluator:
                 logging.error(f"Error occurred while evaluating model!")
             raise CustomException(e, sys)
 
+    @staticmethod
+    def _predict(model, dmatrix):
+        # multi:softmax predicts classes, multi:softprob a probability per class
+        prediction = model.get_booster().predict(dmatrix)
+        return prediction.argmax(axis=1) if prediction.ndim == 2 else prediction.astype(int)
+
     def _get_run_id_and_model(self):
         try:
             logging.info("> Getting model:")
@@ -82,16 +93,21 @@ class ModelEvaluator:
 
             config = ConfigurationManager()
             model_training_config = config.get_model_training_config(log=False)
-            trainer = ModelTrainer(config=model_training_config)
+            trainer = ModelTrainer(config=model_training_config, context=self.context)
 
-            x_train, x_test, y_train, y_test = trainer.get_data(log=False)
+            dtrain, dtest = trainer.get_dmatrices(log=False)
+            y_train, y_test = dtrain.get_label().astype(int), dtest.get_label().astype(int)
 
-            y_pred_train = model.predict(x_train)
-            y_pred_test = model.predict(x_test)
+            # Train and test sets are scored at the same time, from the cached DMatrix
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                y_pred_train, y_pred_test = executor.map(self._predict, [model] * 2, [dtrain, dtest])
 
             train_accuracy_score = self._evaluate_model(y_train, y_pred_train, log=False)
             test_accuracy_score = self._evaluate_model(y_test, y_pred_test, log=False)
 
+            # Spread of the accuracy over stratified folds, besides the single train/test split
+            cv_metrics = trainer.cross_validate() if model_training_config.cv_params.enabled else {"enabled": False}
+
             with mlflow.start_run(run_id=run_id):
                 mlflow.log_metric("train_accuracy_score", train_accuracy_score)
                 logging.info(f"Train metrics: Accuracy Score: {train_accuracy_score}")
@@ -99,6 +115,10 @@ class ModelEvaluator:
                 mlflow.log_metric("test_accuracy_score", test_accuracy_score)
                 logging.info(f"Test metrics: test_accuracy_score: {test_accuracy_score}")
 
+                if "accuracy_mean" in cv_metrics:
+                    mlflow.log_metric("cv_accuracy_mean", cv_metrics["accuracy_mean"])
+                    mlflow.log_metric("cv_accuracy_std", cv_metrics["accuracy_std"])
+
             logging.info("Model metrics logged successfully! Ending run....")
 
             # End Run
@@ -127,6 +147,8 @@ class ModelEvaluator:
             with open(test_metrics_path, 'w') as file:
                 file.write(test_metrics)
 
+            save_json(Path(self.config.cv_metrics), cv_metrics)
+
             logging.info(f"Model metrics are ready. Saved at: {train_metrics_path}, {train_metrics_path}!")
 
         except Exception as e:
@@ -1,33 +1,95 @@
 import os
 import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from pathlib import Path
+from scipy import sparse
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from concurrent.futures import ThreadPoolExecutor
 
 import mlflow
 import dagshub
+from box import ConfigBox
 from urllib.parse import urlparse
+from mlflow.tracking import MlflowClient
+from mlflow.entities import Metric, Param
 
 from xgboost import XGBClassifier
 
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.common import get_file_hash, save_json, load_json
+from src.CategorizeCreditRisk.utils.context import PipelineContext, get_matrix
 from src.CategorizeCreditRisk.entity.config_entity import ModelTrainingConfig
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.components.data_transformation import DataTransformation
+from src.CategorizeCreditRisk.components.hyperparameter_search import HyperparameterSearch
+
+
+class _ResumableEarlyStopping(xgb.callback.EarlyStopping):
+    """
+    Early stopping that carries on from the best round recorded on a resumed (checkpointed) booster
+
+    XGBoost's EarlyStopping starts with an empty history, so the first resumed round would count as the best one.
+    The best score and iteration the booster carries (set by early stopping before it was checkpointed) seed the
+    history instead, so a resumed run stops at the same round as an uninterrupted one.
+    """
+    def before_training(self, model: xgb.Booster) -> xgb.Booster:
+        model = super().before_training(model)
+
+        best_score, best_iteration = model.attr("best_score"), model.attr("best_iteration")
+        if self.starting_round and best_score is not None and best_iteration is not None:
+            self.stopping_history = {self.data: {self.metric_name: [float(best_score)]}}
+            self.best_scores = {self.data: {self.metric_name: [float(best_score)]}}
+            self.current_rounds = self.starting_round - 1 - int(best_iteration)
+
+        return model
 
 
 class ModelTrainer:
-    def __init__(self, config: ModelTrainingConfig):
+    def __init__(self, config: ModelTrainingConfig, context: PipelineContext = None):
         self.config = config
+        self.context = context or PipelineContext()
 
-    @staticmethod
-    def get_data(log=True):
+        # Version of the transformed data, read once
+        self._data_version, self._is_data_version_read = None, False
+
+    def get_data(self, log=True):
         try:
             if log:
                 logging.info("> Getting data for model training:")
 
-            config = ConfigurationManager()
-            data_transformation_config = config.get_data_transformer_config(log=False)
-            transformer = DataTransformation(config=data_transformation_config)
-            _, x_train, x_test, y_train, y_test = transformer.get_transformed_data(log=False)
+            # Matrices produced by the transformation stage, in memory if it ran in this process or else memory-mapped
+            transformed_data = self.context.get_arrays("transformed_data", directory=self.config.transformed_data)
+
+            if transformed_data is not None:
+                x_train, x_test = get_matrix("x_train", transformed_data), get_matrix("x_test", transformed_data)
+
+                # Compact output (sparse or float32) goes to XGBoost as it is, dense float64 output keeps its
+                # named frames; frames are views over the arrays, memory-mapped matrices are not copied
+                if x_train.dtype == np.float64 and not sparse.issparse(x_train):
+                    feature_names = transformed_data["feature_names"].tolist()
+                    x_train = pd.DataFrame(x_train, columns=feature_names, copy=False)
+                    x_test = pd.DataFrame(x_test, columns=feature_names, copy=False)
+
+                y_train = pd.Series(transformed_data["y_train"], copy=False)
+                y_test = pd.Series(transformed_data["y_test"], copy=False)
+
+            else:
+                logging.info(f"No transformed data at: {self.config.transformed_data}, transforming data")
+
+                config = ConfigurationManager()
+                data_transformation_config = config.get_data_transformer_config(log=False)
+                transformer = DataTransformation(config=data_transformation_config)
+                # Artifacts of the transformation stage are not overwritten here
+                _, x_train, x_test, y_train, y_test = transformer.get_transformed_data(log=False, save_artifacts=False)
 
             if log:
                 logging.info("Data is ready for model training!")
@@ -39,11 +101,452 @@ class ModelTrainer:
                 logging.error(f"Error occurred while getting data for model training!")
             raise CustomException(e, sys)
 
+    def _get_data_version(self):
+        # Content hash the transformation stage saved with the transformed data, None if it was transformed in memory
+        if not self._is_data_version_read:
+            self._data_version = self.context.get_arrays_version(
+                "transformed_data", directory=self.config.transformed_data
+            )
+            self._is_data_version_read = True
+
+        return self._data_version
+
+    def _get_dmatrix_cache_files(self, version: str) -> list:
+        return [Path(self.config.dmatrix_cache, f"{split}-{version}.buffer") for split in ["train", "test"]]
+
+    def get_dmatrices(self, log=True) -> tuple:
+        """
+        Train/test DMatrix of the transformed data, built once per version of the transformed data
+
+        A version's DMatrix is saved in XGBoost's binary format and reloaded by training, evaluation and
+        hyperparameter runs instead of ingesting the matrices again. Within a process the same DMatrix objects are
+        reused, so the hist quantization XGBoost caches on them is only computed once.
+
+        Returns:
+            tuple: train and test DMatrix
+        """
+        try:
+            version = self._get_data_version()
+
+            dmatrices = self.context.get(f"dmatrices-{version}") if version else None
+            if dmatrices is not None:
+                return dmatrices
+
+            cache_files = self._get_dmatrix_cache_files(version)
+
+            if version and all(file.exists() for file in cache_files):
+                if log:
+                    logging.info(f"> Loading DMatrix cache (version: {version}) from: {self.config.dmatrix_cache}")
+                dmatrices = tuple(xgb.DMatrix(str(file)) for file in cache_files)
+
+            else:
+                x_train, x_test, y_train, y_test = self.get_data(log=log)
+                arrays = self.context.get_arrays("transformed_data", directory=self.config.transformed_data)
+                feature_names = None if arrays is None else arrays["feature_names"].tolist()
+                # Category codes of the native categorical mode are split on as categories
+                feature_types = arrays["feature_types"].tolist() if arrays and "feature_types" in arrays else None
+
+                dmatrices = tuple(
+                    xgb.DMatrix(
+                        x, label=y, feature_names=feature_names, feature_types=feature_types,
+                        enable_categorical=feature_types is not None
+                    )
+                    for x, y in [(x_train, y_train), (x_test, y_test)]
+                )
+
+                # Data transformed in memory (no version) is not cached
+                if version:
+                    for file in Path(self.config.dmatrix_cache).glob("*.buffer"):
+                        file.unlink()
+                    for dmatrix, file in zip(dmatrices, cache_files):
+                        dmatrix.save_binary(str(file))
+                    if log:
+                        logging.info(f"DMatrix cache (version: {version}) saved at: {self.config.dmatrix_cache}")
+
+            if version:
+                self.context.put(f"dmatrices-{version}", dmatrices)
+
+            return dmatrices
+
+        except Exception as e:
+            if log:
+                logging.error(f"Error occurred while getting DMatrix of transformed data!")
+            raise CustomException(e, sys)
+
+    def search_hyperparameters(self, dtrain: xgb.DMatrix) -> tuple:
+        """
+        Searches the spaces declared in params.yaml (HyperparameterSearch), see HyperparameterSearch
+
+        Args:
+            dtrain (xgb.DMatrix): training DMatrix
+
+        Returns:
+            tuple: best configuration, its score and every trial
+        """
+        try:
+            logging.info("> Searching hyperparameters:")
+            start_time = time.perf_counter()
+
+            search = HyperparameterSearch(self.config.search_params, self.config.model_params)
+
+            # Worker processes load the training DMatrix from XGBoost's binary format
+            version = self._get_data_version()
+            if version and self._get_dmatrix_cache_files(version)[0].exists():
+                best_params, best_score, trials = search.search(
+                    str(self._get_dmatrix_cache_files(version)[0]), dtrain.get_label()
+                )
+            else:
+                with tempfile.TemporaryDirectory(dir=self.config.root_dir) as tmp_dir:
+                    dmatrix_file = os.path.join(tmp_dir, "train.buffer")
+                    dtrain.save_binary(dmatrix_file)
+                    best_params, best_score, trials = search.search(dmatrix_file, dtrain.get_label())
+
+            logging.info(f"Searched {len(trials)} configurations in {time.perf_counter() - start_time:.2f}s")
+
+            return best_params, best_score, trials
+
+        except Exception as e:
+            logging.error(f"Error occurred while searching hyperparameters!")
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _get_booster_params(model_params: dict, n_jobs: int = -1) -> dict:
+        booster_params = XGBClassifier(**model_params, n_jobs=n_jobs).get_xgb_params()
+        return {key: value for key, value in booster_params.items() if value is not None}
+
+    def boost(self, model_params: dict, dtrain: xgb.DMatrix) -> xgb.Booster:
+        """
+        Boosts on the training DMatrix with early stopping on a stratified validation slice of it
+
+        Boosting stops once the validation metric has not improved for early_stopping_rounds (up to max_rounds), the
+        booster is cut back to its best round. It is checkpointed every checkpoint_interval rounds, an interrupted
+        run with the same data and parameters resumes from its latest checkpoint.
+
+        Args:
+            model_params (dict): XGBClassifier parameters
+            dtrain (xgb.DMatrix): training DMatrix
+
+        Returns:
+            xgb.Booster: booster
+        """
+        try:
+            training_params = self.config.training_params
+            early_stopping_rounds = training_params.early_stopping_rounds
+
+            booster_params = self._get_booster_params(model_params)
+            booster_params["eval_metric"] = training_params.eval_metric
+
+            labels = dtrain.get_label()
+            fit_index, valid_index = train_test_split(
+                np.arange(len(labels)), test_size=training_params.validation_size,
+                random_state=training_params.random_state, stratify=labels
+            )
+            dfit, dvalid = dtrain.slice(fit_index), dtrain.slice(valid_index)
+
+            # Boosts up to max_rounds with early stopping, else exactly n_estimators rounds
+            num_rounds = training_params.max_rounds if early_stopping_rounds else model_params["n_estimators"]
+
+            # Checkpoints belong to one version of the data and parameters
+            run_key = hashlib.sha256(json.dumps(
+                {"data": self._get_data_version(), "params": booster_params, "training": training_params},
+                sort_keys=True, default=str
+            ).encode()).hexdigest()[:16]
+            checkpoint_dir = Path(self.config.checkpoint_dir, run_key)
+            checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+            booster, checkpoints = None, sorted(checkpoint_dir.glob("model_*.ubj"), key=lambda f: int(f.stem[6:]))
+            if checkpoints:
+                booster = xgb.Booster()
+                booster.load_model(str(checkpoints[-1]))
+                logging.info(f"Resuming from checkpoint: {checkpoints[-1]} ({booster.num_boosted_rounds()} rounds)")
+
+            # Early stopping runs first, so every checkpoint carries the best round up to its own round
+            callbacks = []
+            if early_stopping_rounds:
+                callbacks.append(_ResumableEarlyStopping(
+                    rounds=early_stopping_rounds, metric_name=training_params.eval_metric, data_name="valid",
+                    save_best=True
+                ))
+            callbacks.append(xgb.callback.TrainingCheckPoint(
+                directory=str(checkpoint_dir), name="model", interval=training_params.checkpoint_interval
+            ))
+
+            rounds_done = booster.num_boosted_rounds() if booster is not None else 0
+            booster = xgb.train(
+                booster_params, dfit, num_boost_round=max(num_rounds - rounds_done, 0), xgb_model=booster,
+                evals=[(dfit, "train"), (dvalid, "valid")], callbacks=callbacks, verbose_eval=False
+            )
+
+            # Run completed, its checkpoints are not needed anymore
+            shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+            logging.info(
+                f"Boosted {booster.num_boosted_rounds()} of up to {num_rounds} rounds "
+                f"(best valid-{training_params.eval_metric}: {booster.attr('best_score') or 'n/a'})"
+            )
+
+            return booster
+
+        except Exception as e:
+            logging.error(f"Error occurred while boosting!")
+            raise CustomException(e, sys)
+
+    def cross_validate(self, log=True) -> dict:
+        """
+        Stratified k-fold cross-validation of the model configuration on the training set
+
+        Folds are built (and preprocessed) once per process and shared through the pipeline context. Folds are
+        trained in parallel, the thread budget (all cores if 0) is split among the fold workers. Every fold boosts
+        n_estimators rounds, as configured in params.yaml. With sequential_baseline the folds are trained once more
+        one after the other, each with the whole thread budget, to measure the speedup.
+
+        Returns:
+            dict: accuracy per fold, its spread and the speedup of parallel folds
+        """
+        try:
+            cv_params = self.config.cv_params
+
+            folds = self.context.get("cv_folds")
+            if folds is None:
+                config = ConfigurationManager()
+                data_transformation_config = config.get_data_transformer_config(log=False)
+                transformer = DataTransformation(config=data_transformation_config)
+                folds = transformer.get_cv_folds(cv_params.n_splits, cv_params.random_state, log=log)
+                self.context.put("cv_folds", folds)
+
+            thread_budget = cv_params.thread_budget or os.cpu_count() or 1
+            workers = max(1, min(cv_params.max_workers, len(folds), thread_budget))
+            booster_params = self._get_booster_params(self.config.model_params, n_jobs=max(1, thread_budget // workers))
+
+            def run_fold(fold: dict, booster_params: dict = booster_params) -> tuple:
+                start_time = time.perf_counter()
+                feature_types = fold.get("feature_types")
+                dfit, dvalid = (
+                    xgb.DMatrix(x, label=y, feature_types=feature_types, enable_categorical=feature_types is not None)
+                    for x, y in [(fold["x_fit"], fold["y_fit"]), (fold["x_valid"], None)]
+                )
+                booster = xgb.train(booster_params, dfit, num_boost_round=self.config.model_params.n_estimators)
+                prediction = booster.predict(dvalid)
+                prediction = prediction.argmax(axis=1) if prediction.ndim == 2 else prediction.astype(int)
+                return accuracy_score(fold["y_valid"], prediction), time.perf_counter() - start_time
+
+            if log:
+                logging.info(
+                    f"> Cross-validating {len(folds)} folds on {workers} workers x {booster_params['n_jobs']} threads:"
+                )
+
+            start_time = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(run_fold, folds))
+            wall_seconds = time.perf_counter() - start_time
+
+            accuracies = np.array([accuracy for accuracy, _ in results])
+            fold_seconds = sum(seconds for _, seconds in results)
+
+            sequential_seconds = None
+            if cv_params.sequential_baseline:
+                start_time = time.perf_counter()
+                for fold in folds:
+                    run_fold(fold, {**booster_params, "n_jobs": thread_budget})
+                sequential_seconds = time.perf_counter() - start_time
+
+            report = {
+                "n_splits": len(folds),
+                "workers": workers,
+                "threads_per_worker": booster_params["n_jobs"],
+                "folds": [
+                    {"fold": fold, "accuracy": float(accuracy), "seconds": seconds}
+                    for fold, (accuracy, seconds) in enumerate(results)
+                ],
+                "accuracy_mean": float(accuracies.mean()),
+                "accuracy_std": float(accuracies.std()),
+                "accuracy_min": float(accuracies.min()),
+                "accuracy_max": float(accuracies.max()),
+                "fold_seconds": fold_seconds,
+                "wall_seconds": wall_seconds,
+                # Sum of fold times over wall-clock, overstated if the thread budget exceeds the cores
+                "estimated_speedup": fold_seconds / wall_seconds,
+                "sequential_seconds": sequential_seconds,
+                "speedup": sequential_seconds / wall_seconds if sequential_seconds else None
+            }
+
+            if log:
+                speedup = report["speedup"] or report["estimated_speedup"]
+                logging.info(
+                    f"Cross-validation accuracy: {report['accuracy_mean']:.4f} +/- {report['accuracy_std']:.4f} "
+                    f"(min {report['accuracy_min']:.4f}, max {report['accuracy_max']:.4f}), "
+                    f"{wall_seconds:.2f}s wall-clock, {speedup:.1f}x over sequential folds"
+                    f"{'' if report['speedup'] else ' (estimated)'}"
+                )
+
+            return report
+
+        except Exception as e:
+            if log:
+                logging.error(f"Error occurred while cross-validating model!")
+            raise CustomException(e, sys)
+
+    def _get_base_model_files(self) -> tuple:
+        base_model_dir = Path(self.config.base_model_dir)
+        return base_model_dir / "model.ubj", base_model_dir / "row_hashes.npy", base_model_dir / "base_model.json"
+
+    def _save_base_model(self, booster: xgb.Booster):
+        """
+        Keeps the model just trained (and registered) as the base of the next warm start, together with the hashes
+        of the rows it was trained on and the hash of the data transformer of its feature space
+        """
+        arrays = self.context.get_arrays("transformed_data", directory=self.config.transformed_data)
+        if arrays is None or "train_row_hash" not in arrays:
+            logging.info("No transformed data on disk, model is not kept as base of a warm start")
+            return
+
+        model_file, row_hashes_file, info_file = self._get_base_model_files()
+        model_file.parent.mkdir(parents=True, exist_ok=True)
+
+        booster.save_model(str(model_file))
+        np.save(row_hashes_file, np.asarray(arrays["train_row_hash"]), allow_pickle=False)
+        save_json(info_file, {"data_transformer_hash": get_file_hash(Path(self.config.data_transformer))})
+
+        logging.info(f"Model kept as base of the next warm start at: {model_file.parent}")
+
+    @staticmethod
+    def _score(booster: xgb.Booster, dmatrix: xgb.DMatrix) -> dict:
+        # Accuracy and log loss on a held-out DMatrix, probabilities are the softmax of the raw margins
+        margins = booster.predict(dmatrix, output_margin=True)
+        probabilities = np.exp(margins - margins.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        labels = dmatrix.get_label().astype(int)
+        return {
+            "accuracy": float(accuracy_score(labels, probabilities.argmax(axis=1))),
+            "mlogloss": float(-np.log(np.clip(probabilities[np.arange(len(labels)), labels], 1e-15, None)).mean())
+        }
+
+    def warm_start(self, model_params: dict, dtrain: xgb.DMatrix, dtest: xgb.DMatrix) -> tuple:
+        """
+        Continues boosting the base model (the model trained last) on the training rows it has not seen, for
+        extra_rounds more rounds
+
+        With compare_full_retrain, a model is also retrained from scratch on every training row (see boost) and the
+        one with the lower log loss on the held-out slice is kept, the cost (seconds) and score of both are reported.
+        The held-out slice is the test rows the base model has not been trained on, the test set of a batch may hold
+        rows of an earlier training set.
+
+        Args:
+            model_params (dict): XGBClassifier parameters
+            dtrain (xgb.DMatrix): training DMatrix
+            dtest (xgb.DMatrix): test DMatrix, the held-out slice is taken from it
+
+        Returns:
+            tuple: booster and warm start report, booster is None if there is no base model to start from
+        """
+        try:
+            warm_start_params = self.config.warm_start_params
+            model_file, row_hashes_file, info_file = self._get_base_model_files()
+
+            if not all(file.exists() for file in [model_file, row_hashes_file, info_file]):
+                logging.info(f"Warm start - No base model at: {model_file.parent}, training from scratch")
+                return None, {"enabled": True, "base_model": False}
+
+            # Data transformer was refitted (new categories, changed features): the base model's feature space is gone
+            if load_json(info_file).data_transformer_hash != get_file_hash(Path(self.config.data_transformer)):
+                logging.info("Warm start - Data transformer was refitted since the base model, training from scratch")
+                return None, {"enabled": True, "base_model": False, "data_transformer_refitted": True}
+
+            base_booster = xgb.Booster()
+            base_booster.load_model(str(model_file))
+
+            if base_booster.num_features() != dtrain.num_col():
+                logging.info(
+                    f"Warm start - Base model has {base_booster.num_features()} features, data has "
+                    f"{dtrain.num_col()}, training from scratch"
+                )
+                return None, {"enabled": True, "base_model": False}
+
+            arrays = self.context.get_arrays("transformed_data", directory=self.config.transformed_data)
+            base_row_hashes = np.load(row_hashes_file, allow_pickle=False)
+            new_index = np.flatnonzero(~np.isin(np.asarray(arrays["train_row_hash"]), base_row_hashes))
+            holdout_index = np.flatnonzero(~np.isin(np.asarray(arrays["test_row_hash"]), base_row_hashes))
+            if not len(holdout_index):
+                # Every test row was trained on already, the models can only be compared on the whole test set
+                holdout_index = np.arange(dtest.num_row())
+            dholdout = dtest.slice(holdout_index)
+
+            logging.info(
+                f"> Warm start - Boosting {warm_start_params.extra_rounds} more rounds from the base model "
+                f"({base_booster.num_boosted_rounds()} rounds) on {len(new_index)} new of {dtrain.num_row()} rows:"
+            )
+
+            start_time = time.perf_counter()
+            booster = base_booster
+            if len(new_index):
+                booster = xgb.train(
+                    self._get_booster_params(model_params), dtrain.slice(new_index),
+                    num_boost_round=warm_start_params.extra_rounds, xgb_model=base_booster
+                )
+            warm_seconds = time.perf_counter() - start_time
+
+            report = {
+                "enabled": True,
+                "base_model": True,
+                "base_rows": len(base_row_hashes),
+                "new_rows": len(new_index),
+                "holdout_rows": len(holdout_index),
+                "extra_rounds": warm_start_params.extra_rounds,
+                "warm_start": {"seconds": warm_seconds, **self._score(booster, dholdout)},
+                "full_retrain": None,
+                "kept": "warm_start"
+            }
+
+            if warm_start_params.compare_full_retrain:
+                logging.info("> Warm start - Retraining from scratch for comparison:")
+                start_time = time.perf_counter()
+                full_booster = self.boost(model_params, dtrain)
+                full_seconds = time.perf_counter() - start_time
+                report["full_retrain"] = {"seconds": full_seconds, **self._score(full_booster, dholdout)}
+
+                if report["full_retrain"]["mlogloss"] < report["warm_start"]["mlogloss"]:
+                    booster, report["kept"] = full_booster, "full_retrain"
+
+            logging.info(
+                f"Warm start - {warm_seconds:.2f}s, holdout accuracy: {report['warm_start']['accuracy']:.4f}"
+                + (
+                    f" vs full retrain - {report['full_retrain']['seconds']:.2f}s, holdout accuracy: "
+                    f"{report['full_retrain']['accuracy']:.4f}" if report["full_retrain"] else ""
+                )
+                + f", kept: {report['kept']}"
+            )
+
+            return booster, report
+
+        except Exception as e:
+            logging.error(f"Error occurred while warm-starting model!")
+            raise CustomException(e, sys)
+
+    def _log_trials(self, run_id: str, trials: list):
+        # Every trial goes to MLflow in batches (log_batch takes up to 1000 metrics and 100 params per call)
+        timestamp, metric = int(time.time() * 1000), self.config.search_params.metric
+
+        metrics = [
+            Metric(f"trial_{i}_valid_{metric}", float(score), timestamp, int(rounds))
+            for i, trial in enumerate(trials) for rounds, score in trial["scores"].items()
+        ]
+        params = [
+            Param(f"trial_{i}_{name}", str(value)) for i, trial in enumerate(trials)
+            for name, value in trial["params"].items()
+        ]
+
+        client = MlflowClient()
+        for start in range(0, max(len(metrics), len(params)), 100):
+            client.log_batch(run_id, metrics=metrics[start:start + 100], params=params[start:start + 100])
+
+        logging.info(f"Logged {len(trials)} trials ({len(metrics)} scores) to run: {run_id}")
+
     def train_model(self):
         try:
             logging.info("> Training model:")
 
-            x_train, x_test, y_train, y_test = self.get_data()
+            dtrain, dtest = self.get_dmatrices()
 
             # Initialize DagsHub
             # Note: Comment below line to run experiment/save model locally
@@ -53,19 +556,59 @@ class ModelTrainer:
             mlflow.set_experiment(self.config.experiment_name)
 
             with mlflow.start_run() as run:
-                # All the parameters are logged in mlflow
                 model_params = self.config.model_params
+                search_params = self.config.search_params
+                best_params, best_score = {}, None
+
+                if search_params.enabled:
+                    best_params, best_score, trials = self.search_hyperparameters(dtrain)
+                    self._log_trials(run.info.run_id, trials)
+                    model_params = ConfigBox({**model_params, **best_params})
+
+                # Configuration the model is trained with is the stage output
+                save_json(Path(self.config.best_params), {
+                    "params": dict(model_params),
+                    "searched": list(best_params),
+                    "metric": search_params.metric if search_params.enabled else None,
+                    "score": best_score
+                })
 
+                # All the parameters are logged in mlflow
                 mlflow.log_param("alpha", model_params.alpha)
                 mlflow.log_param("colsample_bytree", model_params.colsample_bytree)
                 mlflow.log_param("learning_rate", model_params.learning_rate)
                 mlflow.log_param("max_depth", model_params.max_depth)
                 mlflow.log_param("n_estimators", model_params.n_estimators)
+                mlflow.log_param("tree_method", model_params.tree_method)
 
                 logging.info("Logged model parameters successfully! Training Started....")
 
-                xgbc = XGBClassifier(**model_params, n_jobs=-1)
-                xgbc.fit(x_train, y_train)
+                # Continued from the base model if warm-started, else (or without a base model) boosted from scratch
+                booster, warm_start_report = None, {"enabled": False}
+                if self.config.warm_start_params.enabled:
+                    booster, warm_start_report = self.warm_start(model_params, dtrain, dtest)
+                    mlflow.log_param("warm_start", booster is not None)
+
+                # Boosted on the cached DMatrix, then wrapped as a fitted classifier (logged/served as before)
+                if booster is None:
+                    booster = self.boost(model_params, dtrain)
+                enable_categorical = "c" in (booster.feature_types or [])
+                xgbc = XGBClassifier(**model_params, n_jobs=-1, enable_categorical=enable_categorical)
+                xgbc.load_model(bytearray(booster.save_raw()))
+
+                mlflow.log_metric("num_boosted_rounds", booster.num_boosted_rounds())
+                if booster.attr("best_score") is not None:
+                    eval_metric = self.config.training_params.eval_metric
+                    mlflow.log_metric(f"valid_{eval_metric}", float(booster.attr("best_score")))
+
+                save_json(Path(self.config.warm_start_report), warm_start_report)
+                if warm_start_report.get("base_model"):
+                    mlflow.log_metric("warm_start_new_rows", warm_start_report["new_rows"])
+                    for model in ["warm_start", "full_retrain"]:
+                        for name, value in (warm_start_report[model] or {}).items():
+                            mlflow.log_metric(f"{model}_{name}", value)
+
+                self._save_base_model(booster)
 
                 logging.info("Model trained successfully!")
 
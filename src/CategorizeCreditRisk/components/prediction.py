@@ -8,6 +8,7 @@ from urllib.parse import urlparse
 
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.encoding import FeatureEncoder
 from src.CategorizeCreditRisk.entity.config_entity import PredictionConfig
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 
@@ -18,6 +19,7 @@ warnings.filterwarnings("ignore")
 class Predictor:
     def __init__(self, config: PredictionConfig):
         self.config = config
+        self.encoder = FeatureEncoder(self.config.ordinal_encodings, self.config.target_classes)
         self.data_transformer = self._load_data_transformer()
         self.model = self._load_model()
 
@@ -91,20 +93,12 @@ class Predictor:
             data_transformer = self.data_transformer
             model = self.model
 
-            prediction_datapoint = data_transformer.transform(prediction_datapoint)
+            prediction_datapoint = data_transformer.transform(self.encoder.encode(prediction_datapoint))
 
-            prediction = model.predict(prediction_datapoint)[0]
+            # Model predicts target codes, decoded with the same encoding used in training
+            prediction = self.encoder.decode_target(model.predict(prediction_datapoint))[0]
 
-            get_risk_category = {
-                1: "P1 - Least Risk",
-                2: "P2 - Some Risk",
-                3: "P3 - More Risk",
-                4: "P4 - Highest Risk"
-            }
-
-            risk_category = get_risk_category[prediction]
-
-            logging.info(f"Prediction done successfully! RiskCategory: {risk_category}")
+            logging.info(f"Prediction done successfully! RiskCategory: {prediction}")
 
             return prediction
 
@@ -8,7 +8,8 @@ from src.CategorizeCreditRisk.entity.config_entity import (DataIngestionConfig,
                                                            DataTransformationConfig,
                                                            ModelTrainingConfig,
                                                            ModelEvaluationConfig,
-                                                           PredictionConfig)
+                                                           PredictionConfig,
+                                                           PipelineRunnerConfig)
 from src.CategorizeCreditRisk.utils.common import read_yaml, create_directories
 
 
@@ -41,10 +42,13 @@ class ConfigurationManager:
             data_ingestion_config = DataIngestionConfig(
                 root_dir=config.root_dir,
                 source_URL=config.source_URL,
+                source_sha256=config.source_sha256,
                 data_file=config.data_file,
                 unzip_dir=config.unzip_dir,
+                extraction_manifest=config.extraction_manifest,
                 internal_raw_file=config.internal_raw_file,
-                external_raw_file=config.external_raw_file
+                external_raw_file=config.external_raw_file,
+                raw_data_cache_dir=config.raw_data_cache_dir
             )
 
             if log:
@@ -65,6 +69,8 @@ class ConfigurationManager:
             config = self.config.data_validation
             internal_raw_data_schema = self.internal_raw_data_schema.features
             external_raw_data_schema = self.external_raw_data_schema.features
+            internal_allowed_values = self.internal_raw_data_schema.get("allowed_values", {})
+            external_allowed_values = self.external_raw_data_schema.get("allowed_values", {})
 
             create_directories([config.root_dir])
 
@@ -72,10 +78,16 @@ class ConfigurationManager:
                 root_dir=config.root_dir,
                 internal_raw_file=config.internal_raw_file,
                 external_raw_file=config.external_raw_file,
+                raw_data_cache_dir=config.raw_data_cache_dir,
                 internal_file_val_status=config.internal_file_val_status,
                 external_file_val_status=config.external_file_val_status,
+                internal_file_val_report=config.internal_file_val_report,
+                external_file_val_report=config.external_file_val_report,
                 internal_data_schema=internal_raw_data_schema,
-                external_data_schema=external_raw_data_schema
+                external_data_schema=external_raw_data_schema,
+                internal_allowed_values=internal_allowed_values,
+                external_allowed_values=external_allowed_values,
+                chunk_size=config.chunk_size
             )
 
             if log:
@@ -94,9 +106,14 @@ class ConfigurationManager:
                 logging.info("Getting data preprocessing configuration:")
 
             config = self.config.data_preprocessing
+            internal_raw_data_schema = self.internal_raw_data_schema.features
+            external_raw_data_schema = self.external_raw_data_schema.features
             cat_features = self.processed_data_schema.cat_features
             num_features = self.processed_data_schema.num_features
             target_variable = self.processed_data_schema.target_variable
+            target_classes = self.processed_data_schema.target_classes
+            ordinal_encodings = self.processed_data_schema.ordinal_encodings
+            preprocessing_params = self.params.DataPreprocessing
 
             create_directories([config.root_dir])
 
@@ -104,11 +121,22 @@ class ConfigurationManager:
                 root_dir=config.root_dir,
                 internal_raw_file=config.internal_raw_file,
                 external_raw_file=config.external_raw_file,
+                raw_data_cache_dir=config.raw_data_cache_dir,
                 cleaned_raw_dataset=config.cleaned_raw_dataset,
+                cleaned_raw_csv=config.cleaned_raw_csv,
+                merge_report=config.merge_report,
+                chi2_report=config.chi2_report,
+                feature_selection_cache=config.feature_selection_cache,
+                partition_dir=config.partition_dir,
+                internal_data_schema=internal_raw_data_schema,
+                external_data_schema=external_raw_data_schema,
                 preprocessed_dataset=config.preprocessed_dataset,
                 cat_features=cat_features,
                 num_features=num_features,
-                target_variable=target_variable
+                target_variable=target_variable,
+                target_classes=target_classes,
+                ordinal_encodings=ordinal_encodings,
+                preprocessing_params=preprocessing_params
             )
 
             if log:
@@ -127,9 +155,12 @@ class ConfigurationManager:
                 logging.info("Getting data transformation configuration:")
 
             config = self.config.data_transformation
+            transformation_params = self.params.DataTransformation
             cat_features = self.processed_data_schema.cat_features
             num_features = self.processed_data_schema.num_features
             target_variable = self.processed_data_schema.target_variable
+            target_classes = self.processed_data_schema.target_classes
+            ordinal_encodings = self.processed_data_schema.ordinal_encodings
 
             create_directories([config.root_dir])
 
@@ -139,7 +170,15 @@ class ConfigurationManager:
                 cat_features=cat_features,
                 num_features=num_features,
                 target_variable=target_variable,
-                data_transformer=config.data_transformer
+                target_classes=target_classes,
+                ordinal_encodings=ordinal_encodings,
+                data_transformer=config.data_transformer,
+                transformed_data=config.transformed_data,
+                compact_output=transformation_params.compact_output,
+                sparse_threshold=transformation_params.sparse_threshold,
+                native_categorical=transformation_params.native_categorical,
+                category_mapping=config.category_mapping,
+                warm_start=self.params.WarmStart.enabled
             )
 
             if log:
@@ -159,14 +198,29 @@ class ConfigurationManager:
 
             config = self.config.model_training
             model_params = self.params.XGBClassifier
+            training_params = self.params.Training
+            search_params = self.params.HyperparameterSearch
+            cv_params = self.params.CrossValidation
+            warm_start_params = self.params.WarmStart
 
-            create_directories([config.root_dir])
+            create_directories([config.root_dir, config.dmatrix_cache, config.checkpoint_dir, config.base_model_dir])
 
             model_training_config = ModelTrainingConfig(
                 root_dir=config.root_dir,
                 model_params=model_params,
                 experiment_name=config.experiment_name,
-                latest_run_id=config.latest_run_id
+                latest_run_id=config.latest_run_id,
+                transformed_data=config.transformed_data,
+                dmatrix_cache=config.dmatrix_cache,
+                best_params=config.best_params,
+                checkpoint_dir=config.checkpoint_dir,
+                training_params=training_params,
+                search_params=search_params,
+                cv_params=cv_params,
+                data_transformer=config.data_transformer,
+                base_model_dir=config.base_model_dir,
+                warm_start_report=config.warm_start_report,
+                warm_start_params=warm_start_params
             )
 
             if log:
@@ -193,7 +247,8 @@ class ConfigurationManager:
                 latest_run_id=config.latest_run_id,
                 experiment_name=config.experiment_name,
                 train_metrics=config.train_metrics,
-                test_metrics=config.test_metrics
+                test_metrics=config.test_metrics,
+                cv_metrics=config.cv_metrics
             )
 
             if log:
@@ -212,11 +267,15 @@ class ConfigurationManager:
                 logging.info("Getting prediction configuration:")
 
             config = self.config.prediction
+            target_classes = self.processed_data_schema.target_classes
+            ordinal_encodings = self.processed_data_schema.ordinal_encodings
 
             prediction_config = PredictionConfig(
                 latest_run_id=config.latest_run_id,
                 experiment_name=config.experiment_name,
-                data_transformer=config.data_transformer
+                data_transformer=config.data_transformer,
+                target_classes=target_classes,
+                ordinal_encodings=ordinal_encodings
             )
 
             if log:
@@ -228,3 +287,31 @@ class ConfigurationManager:
             if log:
                 logging.error(f"Error occurred while getting prediction configuration!")
             raise CustomException(e, sys)
+
+    def get_pipeline_runner_config(self, log=True) -> PipelineRunnerConfig:
+        try:
+            if log:
+                logging.info("Getting pipeline runner configuration:")
+
+            config = self.config.pipeline_runner
+
+            create_directories([config.root_dir, config.manifest_dir])
+
+            pipeline_runner_config = PipelineRunnerConfig(
+                root_dir=config.root_dir,
+                dvc_file=config.dvc_file,
+                run_report=config.run_report,
+                manifest_dir=config.manifest_dir,
+                code_dir=config.code_dir,
+                max_workers=config.max_workers
+            )
+
+            if log:
+                logging.info("Pipeline runner configuration loaded successfully!")
+
+            return pipeline_runner_config
+
+        except Exception as e:
+            if log:
+                logging.error(f"Error occurred while getting pipeline runner configuration!")
+            raise CustomException(e, sys)
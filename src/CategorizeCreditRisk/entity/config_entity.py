@@ -6,10 +6,13 @@ from dataclasses import dataclass
 class DataIngestionConfig:
     root_dir: Path
     source_URL: str
+    source_sha256: str
     data_file: Path
     unzip_dir: Path
+    extraction_manifest: Path
     internal_raw_file: Path
     external_raw_file: Path
+    raw_data_cache_dir: Path
 
 
 @dataclass(frozen=True)
@@ -17,10 +20,16 @@ class DataValidationConfig:
     root_dir: Path
     internal_raw_file: Path
     external_raw_file: Path
+    raw_data_cache_dir: Path
     internal_file_val_status: Path
     external_file_val_status: Path
+    internal_file_val_report: Path
+    external_file_val_report: Path
     internal_data_schema: dict
     external_data_schema: dict
+    internal_allowed_values: dict
+    external_allowed_values: dict
+    chunk_size: int
 
 
 @dataclass(frozen=True)
@@ -28,11 +37,22 @@ class DataPreprocessingConfig:
     root_dir: Path
     internal_raw_file: Path
     external_raw_file: Path
+    raw_data_cache_dir: Path
     cleaned_raw_dataset: Path
+    cleaned_raw_csv: Path
+    merge_report: Path
+    chi2_report: Path
+    feature_selection_cache: Path
+    partition_dir: Path
+    internal_data_schema: dict
+    external_data_schema: dict
     preprocessed_dataset: Path
     cat_features: list
     num_features: list
     target_variable: str
+    target_classes: list
+    ordinal_encodings: dict
+    preprocessing_params: dict
 
 
 @dataclass(frozen=True)
@@ -42,7 +62,15 @@ class DataTransformationConfig:
     cat_features: list
     num_features: list
     target_variable: str
+    target_classes: list
+    ordinal_encodings: dict
     data_transformer: Path
+    transformed_data: Path
+    compact_output: bool
+    sparse_threshold: float
+    native_categorical: bool
+    category_mapping: Path
+    warm_start: bool
 
 
 @dataclass(frozen=True)
@@ -51,6 +79,17 @@ class ModelTrainingConfig:
     model_params: dict
     experiment_name: str
     latest_run_id: Path
+    transformed_data: Path
+    dmatrix_cache: Path
+    best_params: Path
+    checkpoint_dir: Path
+    training_params: dict
+    search_params: dict
+    cv_params: dict
+    data_transformer: Path
+    base_model_dir: Path
+    warm_start_report: Path
+    warm_start_params: dict
 
 
 @dataclass(frozen=True)
@@ -60,6 +99,7 @@ class ModelEvaluationConfig:
     experiment_name: str
     train_metrics: Path
     test_metrics: Path
+    cv_metrics: Path
 
 
 @dataclass(frozen=True)
@@ -67,3 +107,15 @@ class PredictionConfig:
     latest_run_id: Path
     experiment_name: str
     data_transformer: Path
+    target_classes: list
+    ordinal_encodings: dict
+
+
+@dataclass(frozen=True)
+class PipelineRunnerConfig:
+    root_dir: Path
+    dvc_file: Path
+    run_report: Path
+    manifest_dir: Path
+    code_dir: Path
+    max_workers: int
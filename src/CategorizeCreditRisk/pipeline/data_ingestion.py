@@ -1,6 +1,7 @@
 import sys
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.context import PipelineContext
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.components.data_ingestion import DataIngestion
 
@@ -13,13 +14,14 @@ class DataIngestionPipeline:
         pass
 
     @staticmethod
-    def main():
-        config_manager = ConfigurationManager()
+    def main(config_manager: ConfigurationManager = None, context: PipelineContext = None):
+        config_manager = config_manager or ConfigurationManager()
         data_ingestion_config = config_manager.get_data_ingestion_config()
         data_ingestion = DataIngestion(config=data_ingestion_config)
 
         data_ingestion.download_file()
         data_ingestion.unzip_file()
+        data_ingestion.cache_raw_files()
 
 
 if __name__ == '__main__':
@@ -1,6 +1,7 @@
 import sys
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.context import PipelineContext
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.components.data_preprocessing import DataPreprocessing
 
@@ -13,8 +14,8 @@ class DataPreprocessingPipeline:
         pass
 
     @staticmethod
-    def main():
-        config_manager = ConfigurationManager()
+    def main(config_manager: ConfigurationManager = None, context: PipelineContext = None):
+        config_manager = config_manager or ConfigurationManager()
         data_preprocessing_config = config_manager.get_data_preprocessing_config()
         data_preprocessing = DataPreprocessing(config=data_preprocessing_config)
 
@@ -1,6 +1,7 @@
 import sys
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.context import PipelineContext
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.components.data_transformation import DataTransformation
 
@@ -13,10 +14,10 @@ class DataTransformationPipeline:
         pass
 
     @staticmethod
-    def main():
-        config_manager = ConfigurationManager()
+    def main(config_manager: ConfigurationManager = None, context: PipelineContext = None):
+        config_manager = config_manager or ConfigurationManager()
         data_transformation_config = config_manager.get_data_transformer_config()
-        data_transformation = DataTransformation(config=data_transformation_config)
+        data_transformation = DataTransformation(config=data_transformation_config, context=context)
 
         data_transformation.get_transformed_data()
 
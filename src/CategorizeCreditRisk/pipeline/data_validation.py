@@ -1,6 +1,7 @@
 import sys
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.context import PipelineContext
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.components.data_validation import DataValidation
 
@@ -13,8 +14,8 @@ class DataValidationPipeline:
         pass
 
     @staticmethod
-    def main():
-        config_manager = ConfigurationManager()
+    def main(config_manager: ConfigurationManager = None, context: PipelineContext = None):
+        config_manager = config_manager or ConfigurationManager()
         data_validation_config = config_manager.get_data_validation_config()
         data_validation = DataValidation(config=data_validation_config)
 
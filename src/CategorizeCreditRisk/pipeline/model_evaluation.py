@@ -1,6 +1,7 @@
 import sys
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.context import PipelineContext
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.components.model_evaluation import ModelEvaluator
 
@@ -13,10 +14,10 @@ class ModelEvaluationPipeline:
         pass
 
     @staticmethod
-    def main():
-        config_manager = ConfigurationManager()
+    def main(config_manager: ConfigurationManager = None, context: PipelineContext = None):
+        config_manager = config_manager or ConfigurationManager()
         model_evaluation_config = config_manager.get_model_evaluation_config()
-        model_evaluator = ModelEvaluator(config=model_evaluation_config)
+        model_evaluator = ModelEvaluator(config=model_evaluation_config, context=context)
 
         model_evaluator.get_model_metrics()
 
@@ -1,6 +1,7 @@
 import sys
 from src.CategorizeCreditRisk.logger import logging
 from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.utils.context import PipelineContext
 from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
 from src.CategorizeCreditRisk.components.model_trainer import ModelTrainer
 
@@ -13,10 +14,10 @@ class ModelTrainingPipeline:
         pass
 
     @staticmethod
-    def main():
-        config_manager = ConfigurationManager()
+    def main(config_manager: ConfigurationManager = None, context: PipelineContext = None):
+        config_manager = config_manager or ConfigurationManager()
         model_training_config = config_manager.get_model_training_config()
-        model_trainer = ModelTrainer(config=model_training_config)
+        model_trainer = ModelTrainer(config=model_training_config, context=context)
 
         model_trainer.train_model()
 
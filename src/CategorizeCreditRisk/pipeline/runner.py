@@ -0,0 +1,350 @@
+import sys
+import json
+import time
+import importlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from src.CategorizeCreditRisk.logger import logging
+from src.CategorizeCreditRisk.exception import CustomException
+from src.CategorizeCreditRisk.constants import CONFIG_FILE_PATH
+from src.CategorizeCreditRisk.utils.context import PipelineContext
+from src.CategorizeCreditRisk.utils.common import read_yaml, save_json, load_json, get_file_hash, get_directory_hash
+from src.CategorizeCreditRisk.config.configuration import ConfigurationManager
+from src.CategorizeCreditRisk.entity.config_entity import PipelineRunnerConfig
+
+
+# dvc.yaml stage -> (stage name, pipeline class in src/CategorizeCreditRisk/pipeline/<stage>.py)
+STAGES = {
+    "data_ingestion": ("Data Ingestion", "DataIngestionPipeline"),
+    "data_validation": ("Data Validation", "DataValidationPipeline"),
+    "data_preprocessing": ("Data Preprocessing", "DataPreprocessingPipeline"),
+    "data_transformation": ("Data Transformation", "DataTransformationPipeline"),
+    "model_training": ("Model Training", "ModelTrainingPipeline"),
+    "model_evaluation": ("Model Evaluation", "ModelEvaluationPipeline"),
+}
+
+# dvc.yaml stage -> config.yaml sections its configuration is read from (the config slice of its manifest)
+STAGE_CONFIG_SECTIONS = {
+    "data_ingestion": ["data_ingestion"],
+    "data_validation": ["data_validation"],
+    "data_preprocessing": ["data_preprocessing"],
+    "data_transformation": ["data_transformation"],
+    "model_training": ["model_training", "data_transformation"],
+    "model_evaluation": ["model_evaluation", "model_training", "data_transformation"],
+}
+
+
+def run_stage(stage: str, config_manager: ConfigurationManager = None, context: PipelineContext = None) -> float:
+    """
+    Runs one pipeline stage, its module is only imported when the stage runs
+
+    Args:
+        stage (str): stage as named in dvc.yaml
+        config_manager (ConfigurationManager): shared configuration manager, a new one is created if None
+        context (PipelineContext): artifacts shared with the other stages of the run, loaded from disk if None
+
+    Returns:
+        float: duration in seconds
+    """
+    stage_name, pipeline_class = STAGES[stage]
+
+    try:
+        logging.info(f">>>>>> stage '{stage_name}' started <<<<<<")
+        start_time = time.perf_counter()
+
+        pipeline = getattr(importlib.import_module(f"src.CategorizeCreditRisk.pipeline.{stage}"), pipeline_class)
+        pipeline.main(config_manager=config_manager, context=context)
+
+        duration = time.perf_counter() - start_time
+        logging.info(f">>>>>> stage '{stage_name}' completed in {duration:.2f}s <<<<<<\n")
+
+        return duration
+
+    except Exception as e:
+        logging.error(f"Error occurred while running {stage_name}!")
+        raise CustomException(e, sys)
+
+
+class PipelineRunner:
+    def __init__(self, config: PipelineRunnerConfig, config_manager: ConfigurationManager = None,
+                 max_workers: int = None, executor: str = "thread", force: list = None):
+        self.config = config
+        self.config_manager = config_manager
+        self.max_workers = max_workers or self.config.max_workers
+        self.executor = executor
+        self.force = set(force or [])
+
+    @staticmethod
+    def _get_paths(entries: list) -> list:
+        # Entries are plain paths or {path: {options}} (e.g. persist: true)
+        return [str(next(iter(entry))) if isinstance(entry, dict) else str(entry) for entry in entries or []]
+
+    @staticmethod
+    def _is_same_or_nested(path: str, other: str) -> bool:
+        path, other = Path(path), Path(other)
+        return path == other or other in path.parents or path in other.parents
+
+    def get_stage_graph(self) -> dict:
+        """
+        Builds the stage DAG from dvc.yaml: a stage depends on every stage producing one of its deps
+
+        Returns:
+            dict: upstream stages per stage, in dvc.yaml order
+        """
+        try:
+            dvc_stages = read_yaml(Path(self.config.dvc_file)).stages
+
+            unknown = [stage for stage in dvc_stages if stage not in STAGES]
+            if unknown:
+                raise ValueError(f"Stages - {unknown} in {self.config.dvc_file} have no pipeline to run!")
+
+            outs = {stage: self._get_paths(spec.get("outs")) for stage, spec in dvc_stages.items()}
+
+            graph = {}
+            for stage, spec in dvc_stages.items():
+                deps = self._get_paths(spec.get("deps"))
+                graph[stage] = {
+                    upstream for upstream, upstream_outs in outs.items() if upstream != stage and any(
+                        self._is_same_or_nested(dep, out) for dep in deps for out in upstream_outs
+                    )
+                }
+
+            self._get_topological_order(graph)
+
+            return graph
+
+        except Exception as e:
+            logging.error(f"Error occurred while building stage graph from {self.config.dvc_file}!")
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _get_topological_order(graph: dict) -> list:
+        order, done = [], set()
+
+        while len(order) < len(graph):
+            ready = [stage for stage in graph if stage not in done and graph[stage] <= done]
+            if not ready:
+                raise ValueError(f"Stages - {sorted(set(graph) - done)} form a cycle!")
+            order.extend(ready)
+            done.update(ready)
+
+        return order
+
+    @staticmethod
+    def get_critical_path(graph: dict, durations: dict) -> tuple:
+        """
+        Longest chain of dependent stages, no schedule can finish faster than its length
+
+        Args:
+            graph (dict): upstream stages per stage
+            durations (dict): duration in seconds per stage
+
+        Returns:
+            tuple: stages on the critical path and its length in seconds
+        """
+        finish, previous = {}, {}
+        for stage in PipelineRunner._get_topological_order(graph):
+            upstream = max(graph[stage], key=lambda s: finish[s], default=None)
+            finish[stage] = durations[stage] + (finish[upstream] if upstream else 0.0)
+            previous[stage] = upstream
+
+        stage = max(finish, key=finish.get)
+        length, path = finish[stage], []
+        while stage:
+            path.insert(0, stage)
+            stage = previous[stage]
+
+        return path, length
+
+    @staticmethod
+    def _get_path_hash(path: str):
+        path = Path(path)
+        if path.is_dir():
+            return get_directory_hash(path)
+        return get_file_hash(path) if path.is_file() else None
+
+    @staticmethod
+    def _get_param(params, key: str):
+        # dvc.yaml params are top-level sections of params.yaml or dotted keys inside them
+        for name in key.split("."):
+            params = params[name]
+        return params
+
+    def _get_manifest_file(self, stage: str) -> Path:
+        return Path(self.config.manifest_dir, f"{stage}.json")
+
+    def get_stage_manifest(self, stage: str, spec: dict, config_manager: ConfigurationManager,
+                           code_version: str) -> dict:
+        """
+        Manifest of everything a stage's outputs are derived from: content hash of every dep (files and
+        directories), the config.yaml sections and params.yaml keys it reads and the version of the project code
+
+        Args:
+            stage (str): stage as named in dvc.yaml
+            spec (dict): stage spec in dvc.yaml
+            config_manager (ConfigurationManager): configuration the config and params slices are read from
+            code_version (str): hash of the project code
+
+        Returns:
+            dict: stage manifest
+        """
+        try:
+            manifest = {
+                # config.yaml is replaced by the slice of it the stage reads, other stages' sections do not matter
+                "deps": {
+                    dep: self._get_path_hash(dep)
+                    for dep in self._get_paths(spec.get("deps")) if Path(dep) != CONFIG_FILE_PATH
+                },
+                "config": {section: config_manager.config.get(section) for section in STAGE_CONFIG_SECTIONS[stage]},
+                "params": {key: self._get_param(config_manager.params, key) for key in spec.get("params") or []},
+                "code": code_version
+            }
+
+            # Round trip through json, so the manifest compares equal to the one saved on disk
+            return json.loads(json.dumps(manifest, sort_keys=True))
+
+        except Exception as e:
+            logging.error(f"Error getting manifest of stage: {stage}!")
+            raise CustomException(e, sys)
+
+    def _is_up_to_date(self, stage: str, spec: dict, manifest: dict):
+        """
+        Returns the last successful run of a stage if its manifest matches and its outputs are unchanged since
+        """
+        manifest_file = self._get_manifest_file(stage)
+        if stage in self.force or "all" in self.force or not manifest_file.exists():
+            return None
+
+        last_run = load_json(manifest_file)
+
+        changed = [key for key in manifest if manifest[key] != last_run.inputs.get(key)]
+        if changed:
+            logging.info(f"Stage '{stage}' inputs changed since its last run: {changed}")
+            return None
+
+        outs = {out: self._get_path_hash(out) for out in self._get_paths(spec.get("outs"))}
+        if outs != last_run.outs:
+            logging.info(f"Stage '{stage}' outputs are missing or changed since its last run")
+            return None
+
+        return last_run
+
+    def _save_stage_manifest(self, stage: str, spec: dict, manifest: dict, duration: float):
+        save_json(self._get_manifest_file(stage), {
+            "inputs": manifest,
+            "outs": {out: self._get_path_hash(out) for out in self._get_paths(spec.get("outs"))},
+            "seconds": duration
+        })
+
+    def run(self) -> dict:
+        try:
+            graph = self.get_stage_graph()
+            order = self._get_topological_order(graph)
+
+            unknown = self.force - set(graph) - {"all"}
+            if unknown:
+                raise ValueError(f"Stages to force - {sorted(unknown)} are not in {self.config.dvc_file}!")
+
+            dvc_stages = read_yaml(Path(self.config.dvc_file)).stages
+            manifest_config_manager = self.config_manager or ConfigurationManager()
+            code_version = get_directory_hash(Path(self.config.code_dir), "*.py")
+            manifests, skipped = {}, {}
+
+            logging.info(
+                f"Running {len(graph)} stages with up to {self.max_workers} {self.executor} workers: " +
+                ", ".join(f"{stage} <- {sorted(graph[stage])}" for stage in order)
+            )
+
+            # Processes cannot share the configuration manager and the in-memory artifacts, each stage then builds
+            # its own and loads the artifacts of its upstream stages from disk
+            config_manager = self.config_manager if self.executor == "thread" else None
+            context = PipelineContext() if self.executor == "thread" else None
+            executor_class = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+
+            durations, timeline, done, running = {}, {}, set(), {}
+            run_start = time.perf_counter()
+
+            with executor_class(max_workers=self.max_workers) as executor:
+                while len(done) < len(graph):
+                    for stage in order:
+                        if stage in done or stage in running.values() or not graph[stage] <= done:
+                            continue
+
+                        # Upstream stages are done, so the manifest hashes the outputs this stage would read
+                        manifests[stage] = self.get_stage_manifest(
+                            stage, dvc_stages[stage], manifest_config_manager, code_version
+                        )
+                        last_run = self._is_up_to_date(stage, dvc_stages[stage], manifests[stage])
+
+                        if last_run is not None:
+                            logging.info(f">>>>>> stage '{STAGES[stage][0]}' is up to date, skipped <<<<<<\n")
+                            skipped[stage] = last_run.seconds
+                            durations[stage] = 0.0
+                            now = time.perf_counter() - run_start
+                            timeline[stage] = {"start": now, "end": now}
+                            done.add(stage)
+                            continue
+
+                        running[executor.submit(run_stage, stage, config_manager, context)] = stage
+                        timeline[stage] = {"start": time.perf_counter() - run_start}
+
+                    if not running:
+                        continue
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        stage = running.pop(future)
+                        try:
+                            durations[stage] = future.result()
+                        except Exception:
+                            for pending in running:
+                                pending.cancel()
+                            raise
+                        timeline[stage]["end"] = time.perf_counter() - run_start
+                        self._save_stage_manifest(stage, dvc_stages[stage], manifests[stage], durations[stage])
+                        done.add(stage)
+
+            wall_seconds = time.perf_counter() - run_start
+            serial_seconds = sum(durations.values())
+            critical_path, critical_path_seconds = self.get_critical_path(graph, durations)
+            executed = [stage for stage in order if stage not in skipped]
+            memoized_seconds = sum(skipped.values())
+
+            report = {
+                "max_workers": self.max_workers,
+                "executor": self.executor,
+                "stages": {
+                    stage: {
+                        "upstream": sorted(graph[stage]),
+                        "status": "skipped" if stage in skipped else "executed",
+                        "seconds": durations[stage],
+                        **timeline[stage]
+                    }
+                    for stage in order
+                },
+                "executed": executed,
+                "skipped": list(skipped),
+                "memoized_seconds": memoized_seconds,
+                "critical_path": critical_path,
+                "critical_path_seconds": critical_path_seconds,
+                "serial_seconds": serial_seconds,
+                "wall_seconds": wall_seconds,
+                "saved_seconds": serial_seconds - wall_seconds
+            }
+            save_json(Path(self.config.run_report), report)
+
+            logging.info(
+                f"Executed {len(executed)} stages: {executed}, skipped {len(skipped)} up to date stages: "
+                f"{list(skipped)} (saved {memoized_seconds:.2f}s of their last runs)"
+            )
+            logging.info(f"Critical path ({critical_path_seconds:.2f}s): {' -> '.join(critical_path)}")
+            logging.info(
+                f"Pipeline took {wall_seconds:.2f}s wall-clock vs {serial_seconds:.2f}s of stage time run in "
+                f"sequence (saved {serial_seconds - wall_seconds:.2f}s). Report: {self.config.run_report}"
+            )
+
+            return report
+
+        except Exception as e:
+            logging.error(f"Error occurred while running pipeline stages!")
+            raise CustomException(e, sys)
@@ -3,6 +3,11 @@ import sys
 import json
 import yaml
 import joblib
+import hashlib
+import openpyxl
+import pandas as pd
+import pyarrow.parquet as pq
+from itertools import islice
 from typing import Any
 from pathlib import Path
 from box import ConfigBox
@@ -187,4 +192,197 @@ def get_size(path: Path) -> str:
 
     except Exception as e:
         logging.error(f"Error getting size of file: {path}!")
-        raise CustomException(e, sys)
\ No newline at end of file
+        raise CustomException(e, sys)
+
+
+@ensure_annotations
+def get_file_hash(path: Path) -> str:
+    """
+    Get SHA-256 hash of the file content
+
+    Args:
+        path (Path): path of the file
+
+    Returns:
+        str: hex digest of the file content
+    """
+    try:
+        sha256 = hashlib.sha256()
+
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(chunk)
+
+        return sha256.hexdigest()
+
+    except Exception as e:
+        logging.error(f"Error getting hash of file: {path}!")
+        raise CustomException(e, sys)
+
+
+@ensure_annotations
+def get_directory_hash(path: Path, pattern: str = "*") -> str:
+    """
+    Get SHA-256 hash of a directory, from the relative path and content hash of every file matching the pattern
+
+    Args:
+        path (Path): path of the directory
+        pattern (str): glob pattern of the files to hash, searched recursively
+
+    Returns:
+        str: hex digest of the directory content
+    """
+    try:
+        sha256 = hashlib.sha256()
+
+        for file in sorted(p for p in path.rglob(pattern) if p.is_file() and "__pycache__" not in p.parts):
+            sha256.update(f"{file.relative_to(path).as_posix()}:{get_file_hash(file)}\n".encode())
+
+        return sha256.hexdigest()
+
+    except Exception as e:
+        logging.error(f"Error getting hash of directory: {path}!")
+        raise CustomException(e, sys)
+
+
+@ensure_annotations
+def get_raw_data_cache_file(raw_file: Path, cache_dir: Path) -> Path:
+    """
+    Get path of the Parquet cache for a raw Excel workbook
+
+    Args:
+        raw_file (Path): path to raw Excel workbook
+        cache_dir (Path): directory holding the Parquet cache
+
+    Returns:
+        Path: path to the Parquet cache keyed by the workbook's content hash
+    """
+    return Path(cache_dir, f"{raw_file.stem}-{get_file_hash(raw_file)[:16]}.parquet")
+
+
+@ensure_annotations
+def cache_raw_data(raw_file: Path, cache_dir: Path) -> Path:
+    """
+    Converts raw Excel workbook into a Parquet cache keyed by the workbook's content hash
+
+    Args:
+        raw_file (Path): path to raw Excel workbook
+        cache_dir (Path): directory holding the Parquet cache
+
+    Returns:
+        Path: path to the Parquet cache of the workbook
+    """
+    try:
+        cache_file = get_raw_data_cache_file(raw_file, cache_dir)
+
+        if cache_file.exists():
+            logging.info(f"Raw data cache already exists: {cache_file}")
+            return cache_file
+
+        logging.info(f"> Caching raw data file: {raw_file}")
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        tmp_file = cache_file.with_suffix(".parquet.tmp")
+        pd.read_excel(raw_file).to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+
+        # Caches of older versions of the same workbook are never read again
+        for stale_file in Path(cache_dir).glob(f"{raw_file.stem}-*.parquet"):
+            if stale_file != cache_file:
+                os.remove(stale_file)
+
+        logging.info(f"Raw data cached successfully at: {cache_file}!")
+        return cache_file
+
+    except Exception as e:
+        logging.error(f"Error caching raw data file: {raw_file}!")
+        raise CustomException(e, sys)
+
+
+@ensure_annotations
+def load_raw_data(raw_file: Path, cache_dir: Path) -> pd.DataFrame:
+    """
+    Loads raw data from its Parquet cache, building the cache first if needed
+
+    Args:
+        raw_file (Path): path to raw Excel workbook
+        cache_dir (Path): directory holding the Parquet cache
+
+    Returns:
+        pd.DataFrame: raw data with dtypes preserved
+    """
+    try:
+        cache_file = cache_raw_data(raw_file, cache_dir)
+
+        logging.info(f"> Loading raw data from cache: {cache_file}")
+
+        return pd.read_parquet(cache_file)
+
+    except Exception as e:
+        logging.error(f"Error loading raw data file: {raw_file}!")
+        raise CustomException(e, sys)
+
+
+@ensure_annotations
+def read_raw_data_header(raw_file: Path, cache_dir: Path) -> list:
+    """
+    Reads only the header row of raw data
+
+    Args:
+        raw_file (Path): path to raw Excel workbook
+        cache_dir (Path): directory holding the Parquet cache
+
+    Returns:
+        list: column names, as present in the raw data
+    """
+    try:
+        cache_file = get_raw_data_cache_file(raw_file, cache_dir)
+
+        if cache_file.exists():
+            return list(pq.read_schema(cache_file).names)
+
+        workbook = openpyxl.load_workbook(raw_file, read_only=True, data_only=True)
+        try:
+            return list(next(workbook.active.iter_rows(max_row=1, values_only=True)))
+        finally:
+            workbook.close()
+
+    except Exception as e:
+        logging.error(f"Error reading header of raw data file: {raw_file}!")
+        raise CustomException(e, sys)
+
+
+@ensure_annotations
+def iter_raw_data_chunks(raw_file: Path, cache_dir: Path, chunk_size: int):
+    """
+    Streams raw data in fixed-size row chunks, from its Parquet cache if present else from the workbook
+
+    Args:
+        raw_file (Path): path to raw Excel workbook
+        cache_dir (Path): directory holding the Parquet cache
+        chunk_size (int): number of rows per chunk
+
+    Yields:
+        pd.DataFrame: next chunk of raw data
+    """
+    try:
+        cache_file = get_raw_data_cache_file(raw_file, cache_dir)
+
+        if cache_file.exists():
+            for batch in pq.ParquetFile(cache_file).iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
+            return
+
+        workbook = openpyxl.load_workbook(raw_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = list(next(rows))
+            while chunk := list(islice(rows, chunk_size)):
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            workbook.close()
+
+    except Exception as e:
+        logging.error(f"Error streaming raw data file: {raw_file}!")
+        raise CustomException(e, sys)
@@ -0,0 +1,236 @@
+import sys
+import joblib
+import hashlib
+import threading
+import numpy as np
+from scipy import sparse
+from typing import Any
+from pathlib import Path
+from src.CategorizeCreditRisk.logger import logging
+from src.CategorizeCreditRisk.exception import CustomException
+
+
+def get_matrix_arrays(name: str, matrix) -> dict:
+    """
+    Splits a feature matrix into plain arrays: a sparse matrix is stored as its CSR data, indices, indptr and shape
+
+    Args:
+        name (str): name of the matrix
+        matrix: dense or sparse feature matrix
+
+    Returns:
+        dict: array per name
+    """
+    if not sparse.issparse(matrix):
+        return {name: np.asarray(matrix)}
+
+    matrix = matrix.tocsr()
+    return {
+        f"{name}_data": matrix.data,
+        f"{name}_indices": matrix.indices,
+        f"{name}_indptr": matrix.indptr,
+        f"{name}_shape": np.asarray(matrix.shape)
+    }
+
+
+def get_matrix(name: str, arrays: dict):
+    """
+    Rebuilds a feature matrix from the arrays of get_matrix_arrays, a CSR matrix is built over them without copy
+    """
+    if f"{name}_indptr" not in arrays:
+        return arrays[name]
+
+    return sparse.csr_matrix(
+        (arrays[f"{name}_data"], arrays[f"{name}_indices"], arrays[f"{name}_indptr"]),
+        shape=tuple(arrays[f"{name}_shape"].tolist()),
+        copy=False
+    )
+
+
+def get_arrays_version(arrays: dict) -> str:
+    """
+    Get content hash of a set of arrays (names, dtypes, shapes and values)
+
+    Args:
+        arrays (dict): array per name
+
+    Returns:
+        str: hex digest, first 16 characters
+    """
+    sha256 = hashlib.sha256()
+    for key in sorted(arrays):
+        array = np.ascontiguousarray(arrays[key])
+        sha256.update(f"{key}:{array.dtype.str}:{array.shape}\n".encode())
+        sha256.update(memoryview(array).cast("B"))
+
+    return sha256.hexdigest()[:16]
+
+
+class PipelineContext:
+    """
+    Artifacts produced during a pipeline run (split indices, fitted transformer, transformed matrices)
+
+    Artifacts are kept in memory, so downstream stages running in the same process consume them as they are.
+    Artifacts put with a path are also persisted, so stages running in another process (or a later run) load them
+    from disk instead of recomputing them.
+    """
+    def __init__(self):
+        self._artifacts = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._artifacts
+
+    def put(self, name: str, artifact: Any, path: Path = None):
+        """
+        Keeps an artifact for the rest of the run
+
+        Args:
+            name (str): name of the artifact
+            artifact (Any): artifact
+            path (Path): file the artifact is persisted to, kept in memory only if None
+        """
+        try:
+            with self._lock:
+                self._artifacts[name] = artifact
+
+            if path is not None:
+                logging.info(f"> Persisting artifact: {name} to: {path}")
+                joblib.dump(artifact, path)
+
+        except Exception as e:
+            logging.error(f"Error putting artifact: {name} in pipeline context!")
+            raise CustomException(e, sys)
+
+    def get(self, name: str, path: Path = None) -> Any:
+        """
+        Gets an artifact from memory, or from the file it was persisted to by another process
+
+        Args:
+            name (str): name of the artifact
+            path (Path): file the artifact was persisted to
+
+        Returns:
+            Any: artifact, None if it was neither produced in this process nor persisted
+        """
+        try:
+            with self._lock:
+                if name in self._artifacts:
+                    logging.info(f"Artifact: {name} taken from pipeline context (in memory)")
+                    return self._artifacts[name]
+
+            if path is None or not Path(path).exists():
+                return None
+
+            logging.info(f"> Loading artifact: {name} from: {path}")
+            artifact = joblib.load(path)
+
+            with self._lock:
+                self._artifacts[name] = artifact
+
+            return artifact
+
+        except Exception as e:
+            logging.error(f"Error getting artifact: {name} from pipeline context!")
+            raise CustomException(e, sys)
+
+    def put_arrays(self, name: str, arrays: dict, directory: Path = None):
+        """
+        Keeps a set of arrays for the rest of the run, persisted as one .npy file per array
+
+        Args:
+            name (str): name of the artifact
+            arrays (dict): array per name
+            directory (Path): directory the arrays are persisted to, kept in memory only if None
+        """
+        try:
+            arrays = {key: np.ascontiguousarray(array) for key, array in arrays.items()}
+
+            with self._lock:
+                self._artifacts[name] = arrays
+
+            if directory is not None:
+                logging.info(f"> Persisting arrays: {name} to: {directory}")
+                Path(directory).mkdir(parents=True, exist_ok=True)
+                # Arrays of a previous run may not be part of this set (e.g. dense vs sparse matrices)
+                version_file = Path(directory, "version")
+                version_file.unlink(missing_ok=True)
+                for file in Path(directory).glob("*.npy"):
+                    file.unlink()
+                for key, array in arrays.items():
+                    np.save(Path(directory, f"{key}.npy"), array, allow_pickle=False)
+
+                # Hashed while the arrays are in memory, so consumers never read them back just to version them
+                version = get_arrays_version(arrays)
+                version_file.write_text(version)
+                with self._lock:
+                    self._artifacts[f"{name}-version"] = version
+
+        except Exception as e:
+            logging.error(f"Error putting arrays: {name} in pipeline context!")
+            raise CustomException(e, sys)
+
+    def get_arrays(self, name: str, directory: Path = None):
+        """
+        Gets a set of arrays from memory, or memory-maps them from the directory they were persisted to (no copy
+        is made, pages are read from disk as they are accessed)
+
+        Args:
+            name (str): name of the artifact
+            directory (Path): directory the arrays were persisted to
+
+        Returns:
+            dict: array per name, None if they were neither produced in this process nor persisted
+        """
+        try:
+            with self._lock:
+                if name in self._artifacts:
+                    logging.info(f"Arrays: {name} taken from pipeline context (in memory)")
+                    return self._artifacts[name]
+
+            files = sorted(Path(directory).glob("*.npy")) if directory is not None else []
+            if not files:
+                return None
+
+            logging.info(f"> Memory-mapping arrays: {name} from: {directory}")
+            arrays = {file.stem: np.load(file, mmap_mode="r", allow_pickle=False) for file in files}
+
+            with self._lock:
+                self._artifacts[name] = arrays
+
+            return arrays
+
+        except Exception as e:
+            logging.error(f"Error getting arrays: {name} from pipeline context!")
+            raise CustomException(e, sys)
+
+    def get_arrays_version(self, name: str, directory: Path = None):
+        """
+        Gets the content hash of a set of persisted arrays, saved next to them by put_arrays
+
+        Args:
+            name (str): name of the artifact
+            directory (Path): directory the arrays were persisted to
+
+        Returns:
+            str: version of the arrays, None if they were not persisted (or persisted without their version)
+        """
+        try:
+            with self._lock:
+                if f"{name}-version" in self._artifacts:
+                    return self._artifacts[f"{name}-version"]
+
+            version_file = Path(directory, "version") if directory is not None else None
+            if version_file is None or not version_file.exists() or not any(Path(directory).glob("*.npy")):
+                return None
+
+            version = version_file.read_text().strip()
+
+            with self._lock:
+                self._artifacts[f"{name}-version"] = version
+
+            return version
+
+        except Exception as e:
+            logging.error(f"Error getting version of arrays: {name} from pipeline context!")
+            raise CustomException(e, sys)
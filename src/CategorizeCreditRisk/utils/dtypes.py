@@ -0,0 +1,166 @@
+import sys
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from pandas.api.types import is_numeric_dtype
+from src.CategorizeCreditRisk.logger import logging
+from src.CategorizeCreditRisk.exception import CustomException
+
+
+INTEGER_DTYPES = ["int8", "int16", "int32", "int64"]
+
+
+def is_categorical_feature(series: pd.Series) -> bool:
+    """
+    Checks if a feature is categorical, i.e. stored as Python objects or as pandas Categorical
+
+    Args:
+        series (pd.Series): feature
+
+    Returns:
+        bool: True if categorical
+    """
+    return series.dtype == 'O' or isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def get_memory_usage(df: pd.DataFrame) -> float:
+    """
+    Get memory usage of a dataset in MB, including the Python objects it holds
+
+    Args:
+        df (pd.DataFrame): data
+
+    Returns:
+        float: memory usage in MB
+    """
+    return float(df.memory_usage(index=True, deep=True).sum()) / 1024 ** 2
+
+
+def get_matrix_memory_usage(matrix) -> float:
+    """
+    Get memory usage of a feature matrix in MB, dense (array, DataFrame) or sparse
+
+    Args:
+        matrix: feature matrix
+
+    Returns:
+        float: memory usage in MB
+    """
+    if isinstance(matrix, pd.DataFrame):
+        return get_memory_usage(matrix)
+
+    if sparse.issparse(matrix):
+        matrix = matrix.tocsr()
+        return float(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1024 ** 2
+
+    return float(np.asarray(matrix).nbytes) / 1024 ** 2
+
+
+def get_sentinel_columns(df: pd.DataFrame, columns: list) -> list:
+    """
+    Get the columns whose sentinel values can be masked: numerical and without missing values, so a masked (NA)
+    entry can only be a sentinel value
+
+    Args:
+        df (pd.DataFrame): data
+        columns (list): columns the sentinel cleanup handles
+
+    Returns:
+        list: columns to mask the sentinel in
+    """
+    return [col for col in columns if col in df.columns and is_numeric_dtype(df[col]) and not df[col].isna().any()]
+
+
+def get_dtype_plan(df: pd.DataFrame, schema: dict, sentinel_value: int = None, sentinel_columns: list = ()) -> dict:
+    """
+    Get compact dtype of every schema column, from its declared dtype and the range of values observed
+
+    Integers get the smallest integer dtype holding their range, floats stay float64 and everything else becomes
+    pandas Categorical. Sentinel columns holding the sentinel get the nullable dtype, so the sentinel is carried as
+    a mask instead of a magic value. Elsewhere the sentinel is an ordinary value, and missing values get the
+    nullable dtype.
+
+    Args:
+        df (pd.DataFrame): data
+        schema (dict): declared dtype per column
+        sentinel_value (int): value marking a missing entry
+        sentinel_columns (list): columns to mask the sentinel in, see get_sentinel_columns
+
+    Returns:
+        dict: dtype per column
+    """
+    try:
+        dtype_plan = {}
+
+        for col, declared_dtype in schema.items():
+            if col not in df.columns:
+                continue
+
+            series, declared_dtype = df[col], str(declared_dtype)
+
+            if not declared_dtype.startswith(("int", "float")):
+                dtype_plan[col] = "category"
+                continue
+
+            if not is_numeric_dtype(series):
+                continue
+
+            is_missing = series.isna().to_numpy()
+            if sentinel_value is not None and col in sentinel_columns:
+                is_missing |= (series == sentinel_value).fillna(False).to_numpy(dtype=bool)
+
+            has_missing = bool(is_missing.any())
+
+            if declared_dtype.startswith("float"):
+                dtype_plan[col] = "Float64" if has_missing else "float64"
+                continue
+
+            values = series[~is_missing].to_numpy()
+            if len(values) and not np.array_equal(values, np.round(values)):
+                continue
+
+            low, high = (values.min(), values.max()) if len(values) else (0, 0)
+            dtype = next(
+                dtype for dtype in INTEGER_DTYPES if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max
+            )
+            dtype_plan[col] = dtype.capitalize() if has_missing else dtype
+
+        return dtype_plan
+
+    except Exception as e:
+        logging.error("Error getting dtype plan!")
+        raise CustomException(e, sys)
+
+
+def apply_dtype_plan(
+        df: pd.DataFrame, dtype_plan: dict, sentinel_value: int = None, sentinel_columns: list = ()
+) -> pd.DataFrame:
+    """
+    Casts columns to their planned dtype, sentinel values in sentinel columns become missing (masked)
+
+    Args:
+        df (pd.DataFrame): data
+        dtype_plan (dict): dtype per column, see get_dtype_plan
+        sentinel_value (int): value marking a missing entry
+        sentinel_columns (list): columns to mask the sentinel in, see get_sentinel_columns
+
+    Returns:
+        pd.DataFrame: data with compact dtypes
+    """
+    try:
+        df = df.copy(deep=False)
+
+        for col, dtype in dtype_plan.items():
+            series = df[col]
+
+            # Nullable dtypes (Int8, ..., Float64) are capitalized
+            if sentinel_value is not None and col in sentinel_columns and dtype[0].isupper():
+                series = series.mask(series == sentinel_value)
+
+            df[col] = series.astype(dtype)
+
+        return df
+
+    except Exception as e:
+        logging.error("Error applying dtype plan!")
+        raise CustomException(e, sys)
@@ -0,0 +1,125 @@
+import sys
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from src.CategorizeCreditRisk.logger import logging
+from src.CategorizeCreditRisk.exception import CustomException
+
+
+class FeatureEncoder:
+    """
+    Ordinal encodings of categorical features and of the target, compiled from processed_data_schema.yaml
+
+    Every mapping is compiled once into a hash index plus a code array, so a column is encoded with a single
+    vectorized lookup. Training (preprocessing, transformation) and serving (Predictor, app) share this one spec.
+
+    Args:
+        ordinal_encodings (dict): code per category, per feature
+        target_classes (list): target classes, a class is encoded as its position in this list
+    """
+    def __init__(self, ordinal_encodings: dict, target_classes: list):
+        self.ordinal_encodings = {
+            feature: {str(category): int(code) for category, code in mapping.items()}
+            for feature, mapping in (ordinal_encodings or {}).items()
+        }
+        self.target_classes = [str(label) for label in target_classes]
+
+        self._lookup_tables = {
+            feature: (pd.Index(list(mapping.keys())), np.array(list(mapping.values()), dtype=np.int64))
+            for feature, mapping in self.ordinal_encodings.items()
+        }
+        self._target_index = pd.Index(self.target_classes)
+
+    @property
+    def ordinal_features(self) -> list:
+        return list(self.ordinal_encodings.keys())
+
+    def get_categories(self, feature: str) -> list:
+        return list(self.ordinal_encodings[feature].keys())
+
+    def encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Encodes every ordinal feature present in the data, columns that are numeric already are left as they are
+
+        Args:
+            df (pd.DataFrame): data
+
+        Returns:
+            pd.DataFrame: copy of the data with ordinal features encoded
+        """
+        try:
+            df = df.copy()
+
+            for feature, (categories, codes) in self._lookup_tables.items():
+                if feature not in df.columns or pd.api.types.is_numeric_dtype(df[feature]):
+                    continue
+
+                positions = categories.get_indexer(df[feature].astype(str))
+                if (positions < 0).any():
+                    unknown = sorted(set(df[feature][positions < 0].astype(str)))
+                    raise ValueError(f"Unknown categories for feature - {feature}: {unknown}")
+
+                df[feature] = codes[positions]
+
+            return df
+
+        except Exception as e:
+            logging.error("Error encoding ordinal features!")
+            raise CustomException(e, sys)
+
+    def encode_target(self, target: pd.Series) -> pd.Series:
+        try:
+            positions = self._target_index.get_indexer(target.astype(str))
+            if (positions < 0).any():
+                raise ValueError(f"Unknown target classes: {sorted(set(target[positions < 0].astype(str)))}")
+
+            return pd.Series(positions, index=target.index, name=target.name)
+
+        except Exception as e:
+            logging.error("Error encoding target variable!")
+            raise CustomException(e, sys)
+
+    def decode_target(self, codes) -> np.ndarray:
+        try:
+            return np.asarray(self.target_classes, dtype=object)[np.asarray(codes, dtype=np.int64)]
+
+        except Exception as e:
+            logging.error("Error decoding target variable!")
+            raise CustomException(e, sys)
+
+
+class CategoryCodeEncoder(BaseEstimator, TransformerMixin):
+    """
+    Encodes categorical features as category codes for XGBoost's native categorical support
+
+    The categories seen in fit are sorted and numbered per feature, this mapping is part of the fitted transformer
+    (and of category_mapping.json), so a single row at serving time is encoded with the codes the model was trained
+    on. Codes are float32, a category not seen in fit is encoded as missing (NaN).
+    """
+    def fit(self, x: pd.DataFrame, y=None):
+        x = pd.DataFrame(x)
+        self.feature_names_in_ = np.asarray(x.columns, dtype=object)
+        self.categories_ = {
+            feature: pd.Index(sorted(x[feature].dropna().astype(str).unique())) for feature in x.columns
+        }
+        return self
+
+    def transform(self, x: pd.DataFrame) -> np.ndarray:
+        x = pd.DataFrame(x, columns=self.feature_names_in_)
+        codes = np.empty(x.shape, dtype=np.float32)
+
+        for i, (feature, categories) in enumerate(self.categories_.items()):
+            positions = categories.get_indexer(x[feature].astype(str)).astype(np.float32)
+            positions[positions < 0] = np.nan
+            codes[:, i] = positions
+
+        return codes
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return self.feature_names_in_.copy()
+
+    def get_mapping(self) -> dict:
+        return {
+            feature: {category: code for code, category in enumerate(categories)}
+            for feature, categories in self.categories_.items()
+        }
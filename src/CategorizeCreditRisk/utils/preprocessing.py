@@ -0,0 +1,533 @@
+import sys
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from scipy.stats import f as f_distribution, chi2 as chi2_distribution
+from src.CategorizeCreditRisk.logger import logging
+from src.CategorizeCreditRisk.exception import CustomException
+
+
+def get_sentinel_mask(df: pd.DataFrame, sentinel_value: int, sentinel_columns: list = ()) -> np.ndarray:
+    """
+    Get mask of sentinel (missing) entries, missing values only count in the columns the sentinel was masked in
+
+    Args:
+        df (pd.DataFrame): data
+        sentinel_value (int): value marking a missing entry
+        sentinel_columns (list): columns whose sentinel values are masked (NA), see dtypes.get_sentinel_columns
+
+    Returns:
+        np.ndarray: boolean mask of the shape of the data
+    """
+    position = {col: i for i, col in enumerate(df.columns)}
+
+    # One comparison per dtype block instead of one filtered copy per column
+    is_sentinel = np.zeros(df.shape, dtype=bool)
+    for dtype, block_columns in df.columns.groupby(df.dtypes).items():
+        block = df[block_columns]
+        if isinstance(dtype, np.dtype):
+            mask = block.to_numpy() == sentinel_value
+        else:
+            mask = block.eq(sentinel_value).fillna(False).to_numpy(dtype=bool)
+
+        # Real missing values in the other columns are kept apart from the sentinel
+        is_masked = np.asarray([col in sentinel_columns for col in block_columns])
+        if is_masked.any():
+            mask |= block.isna().to_numpy() & is_masked
+
+        is_sentinel[:, [position[col] for col in block_columns]] = mask
+
+    return is_sentinel
+
+
+def drop_sentinel_values(
+        df: pd.DataFrame, sentinel_value: int, max_sentinel_count: int, sentinel_columns: list = ()
+) -> tuple:
+    """
+    Drops columns with too many sentinel (missing) values, then rows with a sentinel in any remaining column
+
+    Args:
+        df (pd.DataFrame): raw data
+        sentinel_value (int): value marking a missing entry
+        max_sentinel_count (int): columns with more sentinel values than this are dropped
+        sentinel_columns (list): columns whose sentinel values are masked (NA), see dtypes.get_sentinel_columns
+
+    Returns:
+        tuple: cleaned data, dropped columns and sentinel count per column
+    """
+    try:
+        columns = list(df.columns)
+        is_sentinel = get_sentinel_mask(df, sentinel_value, sentinel_columns)
+
+        sentinel_counts = pd.Series(is_sentinel.sum(axis=0), index=columns)
+        is_dropped = (sentinel_counts > max_sentinel_count).to_numpy()
+
+        rows_to_keep = ~is_sentinel[:, ~is_dropped].any(axis=1)
+        columns_to_keep = [col for col, dropped in zip(columns, is_dropped) if not dropped]
+        columns_to_drop = [col for col, dropped in zip(columns, is_dropped) if dropped]
+
+        return df.loc[rows_to_keep, columns_to_keep], columns_to_drop, sentinel_counts
+
+    except Exception as e:
+        logging.error("Error dropping sentinel values!")
+        raise CustomException(e, sys)
+
+
+def merge_on_key(left: pd.DataFrame, right: pd.DataFrame, key: str) -> tuple:
+    """
+    Inner-joins two datasets on a single key through an index lookup, checking the other shared columns
+
+    Args:
+        left (pd.DataFrame): left dataset, its row order is preserved
+        right (pd.DataFrame): right dataset, key must be unique
+        key (str): join key
+
+    Returns:
+        tuple: merged data and number of conflicting rows per shared (non-key) column
+    """
+    try:
+        shared_columns = [col for col in left.columns if col in right.columns and col != key]
+        right_only_columns = [col for col in right.columns if col not in left.columns]
+
+        right_index = pd.Index(right[key])
+        if not right_index.is_unique:
+            logging.info(f"Join key '{key}' is not unique in right dataset, falling back to pd.merge")
+            merged = pd.merge(left, right[[key] + right_only_columns], how='inner', on=key)
+            return merged, {}
+
+        positions = right_index.get_indexer(left[key])
+        is_matched = positions >= 0
+        positions = positions[is_matched]
+
+        left_matched = left.loc[is_matched].reset_index(drop=True)
+        right_matched = right.iloc[positions].reset_index(drop=True)
+
+        conflicts = {}
+        for col in shared_columns:
+            left_values, right_values = left_matched[col], right_matched[col]
+            if any(isinstance(values.dtype, pd.CategoricalDtype) for values in (left_values, right_values)):
+                left_values, right_values = left_values.astype(object), right_values.astype(object)
+            is_equal = left_values.eq(right_values).fillna(False) | (left_values.isna() & right_values.isna())
+            conflicts[col] = int((~is_equal.to_numpy(dtype=bool)).sum())
+
+        merged = pd.concat([left_matched, right_matched[right_only_columns]], axis=1)
+
+        return merged, conflicts
+
+    except Exception as e:
+        logging.error("Error merging datasets on key!")
+        raise CustomException(e, sys)
+
+
+def get_cross_product_matrix(x: np.ndarray, centered: bool = False) -> np.ndarray:
+    """
+    Get cross-product matrix X'X of the numerical features, optionally of the mean-centered features
+
+    Args:
+        x (np.ndarray): numerical features
+        centered (bool): center the features first (VIF with intercept)
+
+    Returns:
+        np.ndarray: cross-product matrix
+    """
+    x = np.asarray(x, dtype=float)
+    if centered:
+        x = x - x.mean(axis=0)
+
+    return x.T @ x
+
+
+def _vif_from_scaled_gram(scaled: np.ndarray, active: list, index: int) -> float:
+    # VIF of a regression of column `index` on the other active columns, solved directly: 1 / (1 - R^2)
+    if scaled[index, index] == 0:
+        return np.nan
+
+    others = [i for i in active if i != index]
+    g = scaled[others, index]
+    unexplained = 1 - g @ np.linalg.pinv(scaled[np.ix_(others, others)]) @ g
+
+    return float(1 / unexplained) if unexplained > 0 else float("inf")
+
+
+def sequential_vif_elimination(gram: np.ndarray, features: list, threshold: float) -> tuple:
+    """
+    Eliminates features in order while their VIF exceeds the threshold, using the cross-product matrix only
+
+    With the cross-product matrix scaled to a unit diagonal, the VIF of every active feature is the diagonal
+    of its inverse. A dropped feature is removed from the inverse with a rank-one update instead of refitting
+    the regressions. An uncentered matrix gives statsmodels' variance_inflation_factor on the features as they
+    are (regressions without intercept), a centered one the VIF of a regression with intercept.
+
+    Args:
+        gram (np.ndarray): cross-product matrix X'X of the numerical features, see get_cross_product_matrix
+        features (list): feature names, in the order of the rows/columns of gram
+        threshold (float): features with VIF above this value are dropped
+
+    Returns:
+        tuple: features kept, features dropped and VIF of each feature when it was checked
+    """
+    try:
+        norms = np.sqrt(np.diag(gram))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # All-zero columns get an all-zero row/column, their VIF is undefined (NaN) and they are dropped
+            scaled = np.nan_to_num(gram / np.outer(norms, norms), nan=0.0)
+
+        def _invert(active: list):
+            # Inverse of an (almost) singular system is not trusted, those steps are solved directly
+            sub = scaled[np.ix_(active, active)]
+            if np.linalg.cond(sub) > 1e10:
+                return None
+            return np.linalg.inv(sub)
+
+        active = list(range(len(features)))
+        inverse = _invert(active)
+        kept, dropped, vif_values = [], [], {}
+
+        for i, feature in enumerate(features):
+            position = active.index(i)
+            vif_value = inverse[position, position] if inverse is not None else _vif_from_scaled_gram(scaled, active, i)
+            vif_values[feature] = float(vif_value)
+
+            if vif_value <= threshold:
+                kept.append(feature)
+                continue
+
+            dropped.append(feature)
+            active.pop(position)
+
+            if inverse is None:
+                inverse = _invert(active)
+            else:
+                rest = [p for p in range(inverse.shape[0]) if p != position]
+                column = inverse[rest, position]
+                inverse = inverse[np.ix_(rest, rest)] - np.outer(column, column) / inverse[position, position]
+
+        return kept, dropped, vif_values
+
+    except Exception as e:
+        logging.error("Error eliminating features by VIF!")
+        raise CustomException(e, sys)
+
+
+def get_class_moments(x: np.ndarray, class_codes: np.ndarray, n_classes: int, shift: np.ndarray = None) -> tuple:
+    """
+    Get per-class count, sum and sum of squares of every feature in one grouped pass
+
+    Args:
+        x (np.ndarray): numerical features (rows x features)
+        class_codes (np.ndarray): class index of every row, rows with a negative code are ignored
+        n_classes (int): number of classes
+        shift (np.ndarray): per-feature value subtracted before summing, for numerical stability
+
+    Returns:
+        tuple: counts (classes), sums (classes x features) and sums of squares (classes x features)
+    """
+    x = np.asarray(x, dtype=float)
+    is_valid = class_codes >= 0
+    x, class_codes = x[is_valid], class_codes[is_valid]
+
+    if shift is not None:
+        x = x - shift
+
+    one_hot = np.zeros((n_classes, len(class_codes)))
+    one_hot[class_codes, np.arange(len(class_codes))] = 1.0
+
+    return np.bincount(class_codes, minlength=n_classes), one_hot @ x, one_hot @ (x * x)
+
+
+def anova_from_moments(counts: np.ndarray, sums: np.ndarray, sums_of_squares: np.ndarray) -> tuple:
+    """
+    One-way ANOVA F statistic and p-value of every feature in closed form from per-class moments
+
+    Args:
+        counts (np.ndarray): rows per class
+        sums (np.ndarray): per-class sums (classes x features)
+        sums_of_squares (np.ndarray): per-class sums of squares (classes x features)
+
+    Returns:
+        tuple: F statistics and p-values, one per feature
+    """
+    try:
+        n_total, n_groups = counts.sum(), len(counts)
+
+        between_term = (sums ** 2 / counts[:, None]).sum(axis=0)
+        ss_between = between_term - sums.sum(axis=0) ** 2 / n_total
+        ss_within = np.clip(sums_of_squares.sum(axis=0) - between_term, 0, None)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f_statistics = (ss_between / (n_groups - 1)) / (ss_within / (n_total - n_groups))
+
+        return f_statistics, f_distribution.sf(f_statistics, n_groups - 1, n_total - n_groups)
+
+    except Exception as e:
+        logging.error("Error performing ANOVA test!")
+        raise CustomException(e, sys)
+
+
+def get_contingency_counts(df: pd.DataFrame, features: list, target: str) -> tuple:
+    """
+    Count every (feature level, target class) pair of all categorical features in one factorize-and-bincount pass
+
+    Args:
+        df (pd.DataFrame): data
+        features (list): categorical features
+        target (str): target variable
+
+    Returns:
+        tuple: counts (levels of all features stacked x target classes), offsets of every feature's levels in the
+            counts (one more than features) and contingency table per feature, missing values are left out like
+            pd.crosstab
+    """
+    try:
+        target_codes, target_classes = pd.factorize(df[target], sort=True)
+        target_classes = np.asarray(target_classes)
+        n_classes = len(target_classes)
+
+        feature_codes, feature_levels, offsets = [], [], [0]
+        for feature in features:
+            codes, levels = pd.factorize(df[feature], sort=True)
+            feature_codes.append(codes)
+            feature_levels.append(np.asarray(levels))
+            offsets.append(offsets[-1] + len(levels))
+
+        # Every (feature, level, class) triple gets its own bin, so one bincount fills all tables
+        codes = np.column_stack(feature_codes) if features else np.empty((len(df), 0), dtype=np.int64)
+        is_valid = (codes >= 0) & (target_codes >= 0)[:, None]
+        bins = (codes + np.asarray(offsets[:-1])) * n_classes + target_codes[:, None]
+        counts = np.bincount(bins[is_valid], minlength=offsets[-1] * n_classes).reshape(-1, n_classes)
+
+        tables = {}
+        for i, feature in enumerate(features):
+            table = counts[offsets[i]:offsets[i + 1]]
+            # Rows/columns without observations are dropped as pd.crosstab does
+            table = pd.DataFrame(table, index=feature_levels[i], columns=target_classes)
+            tables[feature] = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+        return counts, np.asarray(offsets), tables
+
+    except Exception as e:
+        logging.error("Error building contingency tables!")
+        raise CustomException(e, sys)
+
+
+def chi_square_tests(counts: np.ndarray, offsets: np.ndarray, features: list) -> dict:
+    """
+    Chi-square test of independence of every contingency table, evaluated together on the stacked counts
+
+    Matches scipy.stats.chi2_contingency, including Yates' correction for tables with one degree of freedom. Levels
+    and classes without observations are left out, as pd.crosstab does.
+
+    Args:
+        counts (np.ndarray): levels of all features stacked x target classes, see get_contingency_counts
+        offsets (np.ndarray): offsets of every feature's levels in the counts (one more than features)
+        features (list): categorical features
+
+    Returns:
+        dict: statistic, degrees of freedom and p-value per feature
+    """
+    try:
+        counts, offsets = np.asarray(counts, dtype=float), np.asarray(offsets)
+        n_features = len(features)
+
+        # Feature of every level, and starts of the features with at least one level for np.add.reduceat
+        feature_index = np.repeat(np.arange(n_features), np.diff(offsets))
+        has_levels = np.diff(offsets) > 0
+        starts = offsets[:-1][has_levels]
+
+        def sum_per_feature(values: np.ndarray) -> np.ndarray:
+            sums = np.zeros((n_features,) + values.shape[1:])
+            if starts.size:
+                sums[has_levels] = np.add.reduceat(values, starts, axis=0)
+            return sums
+
+        level_sums = counts.sum(axis=1)
+        class_sums = sum_per_feature(counts)
+        totals = class_sums.sum(axis=1)
+
+        n_levels = sum_per_feature((level_sums > 0).astype(float))
+        n_classes = (class_sums > 0).sum(axis=1)
+        dofs = (np.maximum(n_levels - 1, 0) * np.maximum(n_classes - 1, 0)).astype(np.int64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = level_sums[:, None] * class_sums[feature_index] / totals[feature_index, None]
+        is_observed = expected > 0
+        expected = np.where(is_observed, expected, 1.0)
+
+        # Yates' correction, on the tables with one degree of freedom
+        difference = expected - counts
+        observed = np.where(
+            (dofs == 1)[feature_index, None], counts + np.sign(difference) * np.minimum(0.5, np.abs(difference)), counts
+        )
+
+        terms = np.where(is_observed, (observed - expected) ** 2 / expected, 0.0)
+        statistics = np.where(dofs > 0, sum_per_feature(terms.sum(axis=1)), 0.0)
+        p_values = np.where(dofs > 0, chi2_distribution.sf(statistics, np.maximum(dofs, 1)), 1.0)
+
+        return {
+            feature: {"statistic": float(statistic), "dof": int(dof), "p_value": float(p_value)}
+            for feature, statistic, dof, p_value in zip(features, statistics, dofs, p_values)
+        }
+
+    except Exception as e:
+        logging.error("Error performing ChiSq test!")
+        raise CustomException(e, sys)
+
+
+def get_data_fingerprint(df: pd.DataFrame, params: dict) -> str:
+    """
+    Get fingerprint of a dataset (column names, dtypes and values) together with the parameters applied to it
+
+    Args:
+        df (pd.DataFrame): data
+        params (dict): JSON-serializable parameters
+
+    Returns:
+        str: hex digest
+    """
+    try:
+        fingerprint = DataFingerprint()
+        fingerprint.update(df)
+
+        return fingerprint.hexdigest(params)
+
+    except Exception as e:
+        logging.error("Error getting data fingerprint!")
+        raise CustomException(e, sys)
+
+
+class DataFingerprint:
+    """
+    Accumulates, chunk by chunk, the fingerprint of a dataset: equal to get_data_fingerprint of the chunks
+    concatenated in the same order
+    """
+    def __init__(self):
+        self._sha256 = hashlib.sha256()
+        self._has_columns = False
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        try:
+            # Column names and dtypes are taken from the first chunk
+            if not self._has_columns:
+                self._sha256.update(
+                    json.dumps([[str(col), str(dtype)] for col, dtype in chunk.dtypes.items()]).encode()
+                )
+                self._has_columns = True
+
+            self._sha256.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy().tobytes())
+
+        except Exception as e:
+            logging.error("Error accumulating data fingerprint!")
+            raise CustomException(e, sys)
+
+    def hexdigest(self, params: dict) -> str:
+        sha256 = self._sha256.copy()
+        sha256.update(json.dumps(params, sort_keys=True, default=str).encode())
+
+        return sha256.hexdigest()
+
+
+def get_row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Get a 64-bit hash per row of a dataset, independent of its dtypes (numeric values are hashed as float64, every
+    other value as string), so the same row hashes the same whatever dtypes its batch was downcast to
+
+    Args:
+        df (pd.DataFrame): data
+
+    Returns:
+        np.ndarray: uint64 hash per row
+    """
+    try:
+        df = pd.DataFrame({
+            col: df[col].astype("float64") if is_numeric_dtype(df[col]) else df[col].astype(str) for col in df.columns
+        })
+
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    except Exception as e:
+        logging.error("Error getting row hashes!")
+        raise CustomException(e, sys)
+
+
+class SelectionStatistics:
+    """
+    Accumulates, chunk by chunk, everything the feature selection checks need: contingency tables for the
+    chi-square test, the cross-product matrix for VIF and per-class moments for ANOVA
+
+    Args:
+        cat_features (list): categorical features
+        num_features (list): numerical features
+        target (str): target variable
+        classes (list): target classes
+        centered (bool): accumulate the mean-centered cross-product matrix (VIF with intercept)
+    """
+    def __init__(self, cat_features: list, num_features: list, target: str, classes: list, centered: bool = False):
+        self.cat_features, self.num_features = cat_features, num_features
+        self.target, self.classes, self.centered = target, classes, centered
+
+        n_features, n_classes = len(num_features), len(classes)
+
+        self.n_rows = 0
+        self.null_count = 0
+        self.tables = {}
+        self.shift = None
+        self.sums = np.zeros(n_features)
+        self.cross_products = np.zeros((n_features, n_features))
+        self.class_counts = np.zeros(n_classes, dtype=np.int64)
+        self.class_sums = np.zeros((n_classes, n_features))
+        self.class_sums_of_squares = np.zeros((n_classes, n_features))
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        try:
+            self.n_rows += len(chunk)
+            self.null_count += int(chunk.isnull().sum().sum())
+
+            for feature, table in get_contingency_counts(chunk, self.cat_features, self.target)[2].items():
+                self.tables[feature] = table if feature not in self.tables \
+                    else self.tables[feature].add(table, fill_value=0).astype(np.int64)
+
+            x = chunk[self.num_features].to_numpy(dtype=float)
+
+            # Moments are taken around the first chunk's means, which keeps the sums of squares well conditioned
+            if self.shift is None:
+                self.shift = x.mean(axis=0) if len(x) else np.zeros(len(self.num_features))
+
+            shifted = x - self.shift if self.centered else x
+            self.sums += shifted.sum(axis=0)
+            self.cross_products += shifted.T @ shifted
+
+            class_codes = pd.Categorical(chunk[self.target], categories=self.classes).codes.astype(np.int64)
+            counts, sums, sums_of_squares = get_class_moments(x, class_codes, len(self.classes), shift=self.shift)
+            self.class_counts += counts
+            self.class_sums += sums
+            self.class_sums_of_squares += sums_of_squares
+
+        except Exception as e:
+            logging.error("Error accumulating feature selection statistics!")
+            raise CustomException(e, sys)
+
+    def get_contingency_counts(self) -> tuple:
+        # Levels/classes are sorted like a single factorize pass over all rows would
+        tables = {feature: self.tables[feature].sort_index().sort_index(axis=1) for feature in self.cat_features}
+        classes = sorted(set().union(*(table.columns for table in tables.values())))
+
+        # Accumulated tables are stacked once, in the layout of get_contingency_counts
+        counts = np.concatenate(
+            [table.reindex(columns=classes, fill_value=0).to_numpy() for table in tables.values()]
+        ) if tables else np.zeros((0, len(classes)), dtype=np.int64)
+        offsets = np.cumsum([0] + [len(table) for table in tables.values()])
+
+        return counts, offsets, tables
+
+    def get_cross_product_matrix(self) -> np.ndarray:
+        if self.centered:
+            return self.cross_products - np.outer(self.sums, self.sums) / self.n_rows
+
+        return self.cross_products.copy()
+
+    def get_class_moments(self, features: list) -> tuple:
+        index = [self.num_features.index(feature) for feature in features]
+
+        return self.class_counts, self.class_sums[:, index], self.class_sums_of_squares[:, index]
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+from box import ConfigBox
+from src.CategorizeCreditRisk.entity.config_entity import DataPreprocessingConfig
+from src.CategorizeCreditRisk.components.data_preprocessing import DataPreprocessing
+
+
+SENTINEL_VALUE = -99999
+MAX_SENTINEL_COUNT = 2
+
+
+@pytest.fixture
+def raw_data() -> tuple:
+    internal = pd.DataFrame({
+        "PROSPECTID": np.arange(1, 9),
+        "Total_TL": [5, 3, 8, 1, 4, 6, 2, 7],
+        # Not handled by the sentinel cleanup, the sentinel is an ordinary value here
+        "Tot_Closed_TL": [0, SENTINEL_VALUE, 2, 1, 0, 3, 1, 2],
+        "Age_Oldest_TL": [10, 20, SENTINEL_VALUE, 40, 50, 60, 70, 80]
+    })
+    external = pd.DataFrame({
+        "PROSPECTID": np.arange(1, 9),
+        "time_since_recent_payment": [SENTINEL_VALUE] * 3 + [5, 6, 7, 8, 9],
+        "max_delinquency_level": [1, 2, 3, 4, SENTINEL_VALUE, 6, 7, 8],
+        "pct_active_tl": [0.5, 0.2, 0.1, 0.0, 0.3, 0.4, 0.6, 0.7],
+        "MARITALSTATUS": ["Married", "Single", "Married", "Single", "Married", "Single", "Married", "Single"],
+        "Approved_Flag": ["P1", "P2", "P3", "P4", "P1", "P2", "P3", "P4"]
+    })
+
+    return internal, external
+
+
+def baseline_cleanup(internal: pd.DataFrame, external: pd.DataFrame) -> pd.DataFrame:
+    # The sentinel cleanup and merge before the compact dtypes
+    df1, df2 = internal.copy(), external.copy()
+    df1.columns, df2.columns = [col.lower() for col in df1.columns], [col.lower() for col in df2.columns]
+
+    df1 = df1[df1['age_oldest_tl'] != SENTINEL_VALUE]
+
+    columns_to_be_removed = [col for col in df2.columns if (df2[col] == SENTINEL_VALUE).sum() > MAX_SENTINEL_COUNT]
+    df2 = df2.drop(columns_to_be_removed, axis=1)
+    for col in df2.columns:
+        df2 = df2.loc[df2[col] != SENTINEL_VALUE]
+
+    return pd.merge(df1, df2, how='inner', on='prospectid')
+
+
+def get_data_preprocessing(tmp_path, internal: pd.DataFrame, external: pd.DataFrame, compact_dtypes: bool):
+    internal.to_excel(tmp_path / "internal.xlsx", index=False)
+    external.to_excel(tmp_path / "external.xlsx", index=False)
+
+    config = DataPreprocessingConfig(
+        root_dir=tmp_path,
+        internal_raw_file=tmp_path / "internal.xlsx",
+        external_raw_file=tmp_path / "external.xlsx",
+        raw_data_cache_dir=tmp_path / "raw_data_cache",
+        cleaned_raw_dataset=tmp_path / "cleaned_raw.parquet",
+        cleaned_raw_csv=tmp_path / "cleaned_raw.csv",
+        merge_report=tmp_path / "merge_report.json",
+        chi2_report=tmp_path / "chi2_report.json",
+        feature_selection_cache=tmp_path / "feature_selection.json",
+        partition_dir=tmp_path / "partitions",
+        internal_data_schema={"prospectid": "int64", "total_tl": "int64", "tot_closed_tl": "int64",
+                              "age_oldest_tl": "int64"},
+        external_data_schema={"prospectid": "int64", "time_since_recent_payment": "int64",
+                              "max_delinquency_level": "int64", "pct_active_tl": "float64",
+                              "maritalstatus": "object", "approved_flag": "object"},
+        preprocessed_dataset=tmp_path / "processed_data.csv",
+        cat_features={"maritalstatus": "object"},
+        num_features={"total_tl": "int64"},
+        target_variable={"approved_flag": "object"},
+        target_classes=["P1", "P2", "P3", "P4"],
+        ordinal_encodings={},
+        preprocessing_params=ConfigBox({
+            "join_key": "prospectid",
+            "sentinel_value": SENTINEL_VALUE,
+            "max_sentinel_count": MAX_SENTINEL_COUNT,
+            "export_cleaned_raw_csv": False,
+            "compact_dtypes": compact_dtypes,
+            "chunked": False,
+            "chunk_size": 4
+        })
+    )
+
+    return DataPreprocessing(config=config)
+
+
+@pytest.mark.parametrize("compact_dtypes", [False, True])
+def test_sentinel_cleanup_matches_baseline(tmp_path, raw_data, compact_dtypes):
+    data_preprocessing = get_data_preprocessing(tmp_path, *raw_data, compact_dtypes=compact_dtypes)
+    data_preprocessing.save_merged_data()
+    data_preprocessing.wait_for_pending_writes()
+
+    cleaned = data_preprocessing.cleaned_raw_data
+    expected = baseline_cleanup(*raw_data)
+
+    # Sentinel in internal 'tot_closed_tl' is kept as a value, not turned into a missing value
+    assert cleaned.isnull().sum().sum() == 0
+    assert SENTINEL_VALUE in cleaned["tot_closed_tl"].tolist()
+    pd.testing.assert_frame_equal(cleaned.astype(object), expected.astype(object))
+
+
+def test_real_missing_values_are_not_sentinels(tmp_path, raw_data):
+    internal, external = raw_data
+    external = external.assign(pct_active_tl=external["pct_active_tl"].where(external["PROSPECTID"] != 6))
+
+    data_preprocessing = get_data_preprocessing(tmp_path, internal, external, compact_dtypes=True)
+
+    # Column with a real missing value is not masked, its NaN is neither counted nor dropped like the sentinel
+    assert "pct_active_tl" not in data_preprocessing.external_sentinel_columns
+    _, cleaned_external, _ = data_preprocessing._impute_missing_values()
+    assert cleaned_external["pct_active_tl"].isna().sum() == 1
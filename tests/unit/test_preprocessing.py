@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, f_oneway
+from statsmodels.stats.outliers_influence import variance_inflation_factor
+from src.CategorizeCreditRisk.utils.preprocessing import (get_cross_product_matrix,
+                                                          sequential_vif_elimination,
+                                                          get_class_moments,
+                                                          anova_from_moments,
+                                                          get_contingency_counts,
+                                                          chi_square_tests,
+                                                          SelectionStatistics)
+
+
+CLASSES = ["P1", "P2", "P3", "P4"]
+CAT_FEATURES = ["marital", "gender", "product", "constant"]
+NUM_FEATURES = ["x0", "x1", "x2", "x3", "x4"]
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    n_rows = 600
+
+    target = rng.choice(CLASSES, n_rows)
+    x = rng.normal(loc=0.5, size=(n_rows, 3))
+    df = pd.DataFrame({
+        "x0": x[:, 0],
+        "x1": x[:, 1] + (target == "P1"),
+        "x2": x[:, 2],
+        # Nearly collinear with x0 and x1, so the elimination drops something
+        "x3": x[:, 0] + x[:, 1] + rng.normal(scale=0.05, size=n_rows),
+        "x4": 2 * x[:, 2] + rng.normal(scale=0.5, size=n_rows),
+        "marital": rng.choice(["Married", "Single"], n_rows),
+        "gender": np.where(target == "P4", "F", rng.choice(["M", "F"], n_rows)),
+        "product": rng.choice(["AL", "CC", "PL", "HL", "GL"], n_rows),
+        "constant": "same",
+        "target": target
+    })
+
+    return df
+
+
+def reference_vif_elimination(x: np.ndarray, features: list, threshold: float, with_intercept: bool) -> tuple:
+    # The elimination loop the VIF check used before, with statsmodels refitting every regression
+    kept, dropped, columns = [], [], list(range(len(features)))
+    for i, feature in enumerate(features):
+        exog = x[:, columns]
+        if with_intercept:
+            exog = np.column_stack([np.ones(len(x)), exog])
+        vif = variance_inflation_factor(exog, columns.index(i) + with_intercept)
+        if vif <= threshold:
+            kept.append(feature)
+        else:
+            dropped.append(feature)
+            columns.remove(i)
+
+    return kept, dropped
+
+
+@pytest.mark.parametrize("centered", [False, True])
+def test_sequential_vif_elimination_matches_statsmodels(data, centered):
+    x = data[NUM_FEATURES].to_numpy()
+
+    kept, dropped, vif_values = sequential_vif_elimination(
+        get_cross_product_matrix(x, centered=centered), NUM_FEATURES, threshold=6
+    )
+
+    assert (kept, dropped) == reference_vif_elimination(x, NUM_FEATURES, 6, with_intercept=centered)
+    assert dropped
+
+    # First feature is checked against all the others
+    exog = np.column_stack([np.ones(len(x)), x]) if centered else x
+    assert vif_values["x0"] == pytest.approx(variance_inflation_factor(exog, int(centered)), rel=1e-8)
+
+
+def test_anova_from_moments_matches_f_oneway(data):
+    x = data[NUM_FEATURES].to_numpy()
+    class_codes = pd.Categorical(data["target"], categories=CLASSES).codes.astype(np.int64)
+
+    f_statistics, p_values = anova_from_moments(
+        *get_class_moments(x, class_codes, len(CLASSES), shift=x.mean(axis=0))
+    )
+
+    for i in range(len(NUM_FEATURES)):
+        expected = f_oneway(*[x[class_codes == code, i] for code in range(len(CLASSES))])
+        assert f_statistics[i] == pytest.approx(expected.statistic, rel=1e-8)
+        assert p_values[i] == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-300)
+
+
+def test_chi_square_tests_match_chi2_contingency(data):
+    # Two classes give 2x2 tables, where Yates' correction applies
+    data = data.assign(binary=np.where(data["target"].isin(["P1", "P2"]), "A", "B"))
+
+    for target in ["target", "binary"]:
+        counts, offsets, tables = get_contingency_counts(data, CAT_FEATURES, target)
+        results = chi_square_tests(counts, offsets, CAT_FEATURES)
+
+        for feature in CAT_FEATURES:
+            table = pd.crosstab(data[feature], data[target])
+            pd.testing.assert_frame_equal(tables[feature], table, check_names=False)
+
+            if min(table.shape) < 2:
+                assert results[feature] == {"statistic": 0.0, "dof": 0, "p_value": 1.0}
+                continue
+
+            statistic, p_value, dof, _ = chi2_contingency(table)
+            assert results[feature]["dof"] == dof
+            assert results[feature]["statistic"] == pytest.approx(statistic, rel=1e-10)
+            assert results[feature]["p_value"] == pytest.approx(p_value, rel=1e-8)
+
+
+@pytest.mark.parametrize("centered", [False, True])
+def test_selection_statistics_match_in_memory(data, centered):
+    stats = SelectionStatistics(CAT_FEATURES, NUM_FEATURES, "target", CLASSES, centered=centered)
+    for start in range(0, len(data), 170):
+        stats.update(data.iloc[start:start + 170])
+
+    x = data[NUM_FEATURES].to_numpy()
+    class_codes = pd.Categorical(data["target"], categories=CLASSES).codes.astype(np.int64)
+
+    assert stats.n_rows == len(data)
+    assert stats.null_count == 0
+
+    counts, offsets, tables = stats.get_contingency_counts()
+    expected_counts, expected_offsets, expected_tables = get_contingency_counts(data, CAT_FEATURES, "target")
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_array_equal(offsets, expected_offsets)
+    for feature in CAT_FEATURES:
+        pd.testing.assert_frame_equal(tables[feature], expected_tables[feature], check_dtype=False)
+
+    np.testing.assert_allclose(
+        stats.get_cross_product_matrix(), get_cross_product_matrix(x, centered=centered), rtol=1e-10
+    )
+
+    np.testing.assert_allclose(
+        anova_from_moments(*stats.get_class_moments(NUM_FEATURES))[0],
+        anova_from_moments(*get_class_moments(x, class_codes, len(CLASSES), shift=x.mean(axis=0)))[0],
+        rtol=1e-8
+    )